@@ -228,11 +228,8 @@ async def get_merge_sbom(
         force_regenerate: Force regeneration of merged SBOM (default: False)
     """
     try:
-        results = await sbom_service.get_scan_results(scan_id)
-        if not results:
-            raise HTTPException(status_code=404, detail="Scan not found")
-        
-        # Use the new custom merge functionality with options
+        # Use the new custom merge functionality with options;
+        # the same query tells us whether the scan exists
         merged_sbom = await sbom_service.get_merged_sbom(
             scan_id=scan_id,
             include_all_unique=include_all_unique,
@@ -240,6 +237,8 @@ async def get_merge_sbom(
             force_regenerate=force_regenerate
         )
         
+        if merged_sbom is None:
+            raise HTTPException(status_code=404, detail="Scan not found")
         if not merged_sbom:
             raise HTTPException(status_code=400, detail="Failed to create merged SBOM")
         
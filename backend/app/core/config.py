@@ -10,12 +10,28 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "SBOM Generator"
 
     DOCKER_REGISTRY: Optional[str] = None
+    SCANNER_IMAGE: str = "yazat/scanners"
     SCANNER_IMAGE_TAG: str = "latest"
 
+    # Number of warm scanner containers to exec scans in (0 runs the CLIs locally)
+    SCANNER_POOL_SIZE: int = 0
+    # Host path of TEMP_DIR when this service itself runs in a container
+    SCANNER_POOL_HOST_TEMP_DIR: Optional[str] = None
+
+    # Worker processes for walking scanner SBOMs into package rows
+    EXTRACT_WORKERS: int = 4
+
     # REDIS_URL: str = "redis://localhost:6379"
 
     TEMP_DIR: str = "./temp"
+    # Opt-in tmpfs to check repositories out into (e.g. /dev/shm); it must fit the largest
+    # repository scanned, since a full tmpfs fails the scan. TEMP_DIR is used when unset
+    SCAN_TMPFS_DIR: Optional[str] = None
     RESULTS_DIR: str = "./results"
+    # Bare clones reused across scans; defaults to TEMP_DIR/_cache
+    CLONE_CACHE_DIR: Optional[str] = None
+    # Least recently used clones are evicted once the cache grows past this
+    MAX_CACHE_BYTES: int = 10 * 1024 ** 3
 
     LOG_DIR: str = "./logs"
     LOG_LEVEL: str = "INFO"
@@ -2,6 +2,6 @@
 Database package initialization
 """
 from .database import init_db, get_db_session, AsyncSessionLocal
-from .models import ScanResultsDB, UploadedScanResultsDB
+from .models import ScanResultsDB, UploadedScanResultsDB, SBOMCacheDB
 
-__all__ = ["init_db", "get_db_session", "AsyncSessionLocal", "ScanResultsDB", "UploadedScanResultsDB"]
\ No newline at end of file
+__all__ = ["init_db", "get_db_session", "AsyncSessionLocal", "ScanResultsDB", "UploadedScanResultsDB", "SBOMCacheDB"]
\ No newline at end of file
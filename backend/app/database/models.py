@@ -13,6 +13,7 @@ class ScanResultsDB(Base):
     scan_id = Column(String, primary_key=True)
     status = Column(String, nullable=False)
     repo_url = Column(String)
+    commit_sha = Column(String)  # Commit the scanners ran against
     tech_stack = Column(JSONB)
     trivy_sbom = Column(JSONB)
     syft_sbom = Column(JSONB) 
@@ -36,6 +37,15 @@ class UploadedScanResultsDB(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True))
 
+class SBOMCacheDB(Base):
+    __tablename__ = "sbom_cache"
+    
+    # Scanner output is a pure function of the checked-out commit
+    scanner_name = Column(String, primary_key=True)
+    commit_sha = Column(String, primary_key=True)
+    sbom_result = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class Package(Base):
     __tablename__ = "packages"
     
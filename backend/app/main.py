@@ -5,6 +5,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
 from app.api.v1.api import api_router
+from app.api.v1.endpoints import sbom_service
 from app.core.config import settings
 from app.database import init_db
 
@@ -14,8 +15,10 @@ from pathlib import Path
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    sbom_service.start_extract_pool()
     yield
-    # Shutdown (nothing to do for now)
+    # Shutdown
+    await sbom_service.aclose()
 
 app = FastAPI(
     title="SBOM Generator Beta",
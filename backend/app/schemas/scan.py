@@ -43,6 +43,7 @@ class ScanResults(BaseModel):
     repo_url: str
     created_at: datetime
     completed_at: Optional[datetime] = None
+    commit_sha: Optional[str] = None
     trivy_sbom: Optional[SBOMResult] = None
     syft_sbom: Optional[SBOMResult] = None
     cdxgen_sbom: Optional[SBOMResult] = None
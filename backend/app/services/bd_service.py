@@ -3,7 +3,8 @@ import httpx
 import asyncio
 import zipfile
 import io
-import json
+import orjson
+from contextlib import asynccontextmanager
 from typing import Optional, Dict, Any
 from app.core.config import settings
 
@@ -13,10 +14,24 @@ logger = logging.getLogger(__name__)
 class BDService:
     """Service for interacting with Black Duck APIs"""
     
-    def __init__(self, base_url: str = "https://blackduck.philips.com"):
+    def __init__(
+        self, 
+        base_url: str = "https://blackduck.philips.com",
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
         self.base_url = base_url.rstrip('/')
         self.logger = logging.getLogger(__name__)
         self.timeout = getattr(settings, 'BD_TIMEOUT', 60)
+        self.http_client = http_client
+    
+    @asynccontextmanager
+    async def _client(self):
+        """Yield the shared HTTP client if one was provided, else a short-lived one."""
+        if self.http_client:
+            yield self.http_client
+        else:
+            async with httpx.AsyncClient() as client:
+                yield client
     
     async def _authenticate(self, api_token: str) -> str:
         """
@@ -39,9 +54,9 @@ class BDService:
         
         logger.info("Authenticating to Black Duck...")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self._client() as client:
             try:
-                response = await client.post(url, headers=headers)
+                response = await client.post(url, headers=headers, timeout=30.0)
                 response.raise_for_status()
                 
                 data = response.json()
@@ -75,9 +90,9 @@ class BDService:
         
         logger.info(f"Searching for project: {project_name}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self._client() as client:
             try:
-                response = await client.get(url, headers=headers)
+                response = await client.get(url, headers=headers, timeout=30.0)
                 response.raise_for_status()
                 
                 data = response.json()
@@ -125,9 +140,9 @@ class BDService:
         
         logger.info(f"Searching for version '{version_name}' in project {project_id}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self._client() as client:
             try:
-                response = await client.get(url, headers=headers)
+                response = await client.get(url, headers=headers, timeout=30.0)
                 response.raise_for_status()
                 
                 data = response.json()
@@ -181,9 +196,9 @@ class BDService:
         
         logger.info(f"Creating SBOM report for project {project_id}, version {version_id}")
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with self._client() as client:
             try:
-                response = await client.post(url, headers=headers, json=payload)
+                response = await client.post(url, headers=headers, json=payload, timeout=60.0)
                 response.raise_for_status()
                 
                 # Extract report ID from Location header
@@ -232,11 +247,11 @@ class BDService:
         
         logger.info(f"Waiting for report {report_id} to be ready...")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self._client() as client:
             waited = 0
             while waited < max_wait:
                 try:
-                    response = await client.get(url, headers=headers)
+                    response = await client.get(url, headers=headers, timeout=30.0)
                     
                     if response.status_code == 200:
                         data = response.json()
@@ -291,9 +306,9 @@ class BDService:
         
         logger.info(f"Downloading SBOM report {report_id}")
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with self._client() as client:
             try:
-                response = await client.get(url, headers=headers)
+                response = await client.get(url, headers=headers, timeout=60.0)
                 response.raise_for_status()
                 
                 # Black Duck returns a ZIP file containing the JSON
@@ -317,7 +332,7 @@ class BDService:
                     
                     # Read and parse JSON
                     with zip_file.open(json_file) as f:
-                        sbom_data = json.load(f)
+                        sbom_data = orjson.loads(f.read())
                 
                 logger.info(f"Successfully downloaded and extracted SBOM report {report_id}")
                 return sbom_data
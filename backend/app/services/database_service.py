@@ -2,27 +2,55 @@
 Database service for SBOM operations
 """
 import json
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Dict, Optional, List, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 import logging
 
-from app.database import AsyncSessionLocal, ScanResultsDB, UploadedScanResultsDB
+from app.database import AsyncSessionLocal, ScanResultsDB, UploadedScanResultsDB, SBOMCacheDB
 from app.database.models import Package, Dependency
 from app.schemas.scan import ScanResults, ScanStatus, SBOMResult, ScannerType, UploadedScanResults
 from sqlalchemy import text, func
 
 logger = logging.getLogger(__name__)
 
+# Rows per executemany call when bulk inserting packages and dependencies
+INSERT_BATCH_SIZE = 5000
+
+# Scanner pairs that already agree exactly on this share of the smaller scanner's
+# packages are left out of fuzzy matching
+FUZZY_SKIP_EXACT_RATIO = 0.9
+
 class DatabaseService:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
     
-    async def save_scan_results(self, scan_results: ScanResults) -> bool:
-        """Save scan results to database"""
+    @asynccontextmanager
+    async def _session(self, session: Optional[AsyncSession] = None):
+        """
+        Yield the caller's session, or a new one that is committed on exit.
+        A passed-in session is only flushed, so the caller decides when its transaction commits.
+        """
+        if session is not None:
+            yield session
+            await session.flush()
+            return
+        
+        async with AsyncSessionLocal() as new_session:
+            yield new_session
+            await new_session.commit()
+    
+    async def save_scan_results(self, scan_results: ScanResults, session: Optional[AsyncSession] = None) -> bool:
+        """
+        Save scan results to database.
+        Errors are re-raised when a session is passed in, so the caller's transaction is not committed half-done.
+        """
+        owns_session = session is None
         try:
-            async with AsyncSessionLocal() as session:
+            async with self._session(session) as session:
                 # Convert SBOMResult objects to JSON
                 trivy_sbom_json = None
                 if scan_results.trivy_sbom:
@@ -86,6 +114,7 @@ class DatabaseService:
                     scan_id=scan_results.scan_id,
                     status=scan_results.status.value,
                     repo_url=scan_results.repo_url,
+                    commit_sha=scan_results.commit_sha,
                     tech_stack=scan_results.tech_stack,
                     trivy_sbom=trivy_sbom_json,
                     syft_sbom=syft_sbom_json,
@@ -108,6 +137,7 @@ class DatabaseService:
                     # Update existing record
                     existing_scan.status = scan_results.status.value
                     existing_scan.repo_url = scan_results.repo_url
+                    existing_scan.commit_sha = scan_results.commit_sha
                     existing_scan.tech_stack = scan_results.tech_stack
                     existing_scan.trivy_sbom = trivy_sbom_json
                     existing_scan.syft_sbom = syft_sbom_json
@@ -121,13 +151,14 @@ class DatabaseService:
                     # Add new record
                     session.add(db_scan)
                 
-                await session.commit()
                 logger.info(f"Successfully saved scan results for scan_id: {scan_results.scan_id}")
                 return True
         except Exception as e:
             logger.error(f"Error saving scan results {scan_results.scan_id}: {e}")
             import traceback
             logger.error(f"Full traceback: {traceback.format_exc()}")
+            if not owns_session:
+                raise
             return False
     
     async def get_scan_results(self, scan_id: str) -> Optional[ScanResults]:
@@ -148,6 +179,7 @@ class DatabaseService:
                     scan_id=db_scan.scan_id,
                     status=ScanStatus(db_scan.status),
                     repo_url=db_scan.repo_url,
+                    commit_sha=db_scan.commit_sha,
                     tech_stack=db_scan.tech_stack,
                     created_at=db_scan.created_at,
                     completed_at=db_scan.completed_at,
@@ -208,6 +240,46 @@ class DatabaseService:
             logger.error(f"Error getting scan results {scan_id}: {e}")
             return None
     
+    async def get_scan_status(self, scan_id: str) -> Optional[str]:
+        """
+        Get the status of a repository or uploaded scan in one round-trip,
+        without loading any of the SBOM columns.
+        """
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    text("""
+                        SELECT status FROM scan_results WHERE scan_id = :scan_id
+                        UNION ALL
+                        SELECT status FROM uploaded_scan_results WHERE scan_id = :scan_id
+                        LIMIT 1
+                    """),
+                    {"scan_id": scan_id}
+                )
+                return result.scalar_one_or_none()
+        except Exception as e:
+            logger.error(f"Error getting scan status {scan_id}: {e}")
+            return None
+    
+    async def get_scan_summary(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the status and tech stack of a repository scan,
+        without loading any of the SBOM columns.
+        """
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(ScanResultsDB.status, ScanResultsDB.tech_stack)
+                    .where(ScanResultsDB.scan_id == scan_id)
+                )
+                row = result.one_or_none()
+                if not row:
+                    return None
+                return {"status": ScanStatus(row.status), "tech_stack": row.tech_stack}
+        except Exception as e:
+            logger.error(f"Error getting scan summary {scan_id}: {e}")
+            return None
+    
     async def save_uploaded_scan_results(self, uploaded_scan: UploadedScanResults) -> bool:
         """Save uploaded scan results to database"""
         try:
@@ -290,62 +362,172 @@ class DatabaseService:
             logger.error(f"Error getting uploaded scan results {scan_id}: {e}")
             return None
     
+    async def get_cached_sbom(self, scanner: ScannerType, commit_sha: str) -> Optional[SBOMResult]:
+        """Get a previously generated scanner SBOM for the same commit, if any"""
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(SBOMCacheDB.sbom_result).where(
+                        SBOMCacheDB.scanner_name == scanner.value,
+                        SBOMCacheDB.commit_sha == commit_sha
+                    )
+                )
+                cached = result.scalar_one_or_none()
+                if not cached:
+                    return None
+                
+                return SBOMResult(
+                    scanner=scanner,
+                    sbom=cached["sbom"],
+                    component_count=cached["component_count"]
+                )
+        except Exception as e:
+            logger.error(f"Error getting cached SBOM for {scanner.value} at {commit_sha}: {e}")
+            return None
+    
+    async def save_cached_sbom(self, commit_sha: str, sbom_result: SBOMResult) -> bool:
+        """Cache a successful scanner SBOM keyed by (scanner, commit_sha)"""
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    insert(SBOMCacheDB).values(
+                        scanner_name=sbom_result.scanner.value,
+                        commit_sha=commit_sha,
+                        sbom_result={
+                            "sbom": sbom_result.sbom,
+                            "component_count": sbom_result.component_count
+                        }
+                    ).on_conflict_do_nothing()
+                )
+                await session.commit()
+                return True
+        except Exception as e:
+            logger.error(f"Error caching SBOM for {sbom_result.scanner.value} at {commit_sha}: {e}")
+            return False
+    
     async def save_packages(self, scan_id: str, scanner_name: str, packages: List[Dict[str, Any]]) -> bool:
         """
         Bulk insert packages for a specific scan and scanner.
         Now includes additional metadata fields.
         """
+        return await self.save_packages_bulk(scan_id, {scanner_name: packages})
+    
+    async def save_packages_bulk(
+        self,
+        scan_id: str,
+        packages_by_scanner: Dict[str, List[Dict[str, Any]]],
+        session: Optional[AsyncSession] = None
+    ) -> bool:
+        """
+        Replace the packages of several scanners for a scan in one transaction.
+        
+        Args:
+            scan_id: Scan the packages belong to
+            packages_by_scanner: Extracted packages keyed by scanner name
+            session: Open session to run in; the caller commits it, and errors are re-raised
+        
+        Returns:
+            True if the packages were saved
+        """
+        scanner_names = list(packages_by_scanner)
+        if not scanner_names:
+            return True
+        
+        owns_session = session is None
         try:
-            async with AsyncSessionLocal() as session:
+            async with self._session(session) as session:
                 # First, delete dependencies (to avoid foreign key constraint violation)
                 await session.execute(
-                    text("DELETE FROM dependencies WHERE scan_id = :scan_id AND scanner_name = :scanner_name"),
-                    {"scan_id": scan_id, "scanner_name": scanner_name}
+                    text("DELETE FROM dependencies WHERE scan_id = :scan_id AND scanner_name = ANY(:scanner_names)"),
+                    {"scan_id": scan_id, "scanner_names": scanner_names}
                 )
                 
-                # Then, delete any existing packages for this scan_id and scanner
+                # Then, delete any existing packages for this scan_id and these scanners
                 await session.execute(
-                    text("DELETE FROM packages WHERE scan_id = :scan_id AND scanner_name = :scanner_name"),
-                    {"scan_id": scan_id, "scanner_name": scanner_name}
+                    text("DELETE FROM packages WHERE scan_id = :scan_id AND scanner_name = ANY(:scanner_names)"),
+                    {"scan_id": scan_id, "scanner_names": scanner_names}
                 )
                 
-                # Bulk insert new packages with enhanced fields
-                package_objects = [
-                    Package(
-                        scan_id=scan_id,
-                        scanner_name=scanner_name,
-                        name=pkg["name"],
-                        version=pkg["version"],
-                        purl=pkg.get("purl", ""),
-                        cpe=pkg.get("cpe", ""),
-                        original_ref=pkg.get("original_ref", pkg.get("purl", f"{pkg['name']}@{pkg['version']}")),
-                        licenses=pkg.get("licenses", ""),
-                        component_type=pkg.get("component_type", "library"),
-                        description=pkg.get("description", ""),
-                        match_status="unique",  # Default, will be updated during merge
-                        primary=pkg.get("primary", "false")
-                    )
+                # Bulk insert new packages with enhanced fields.
+                # Core executemany skips per-row ORM objects and is sent as multi-row INSERTs.
+                package_rows = [
+                    {
+                        "scan_id": scan_id,
+                        "scanner_name": scanner_name,
+                        "name": pkg["name"],
+                        "version": pkg["version"],
+                        "purl": pkg.get("purl", ""),
+                        "cpe": pkg.get("cpe", ""),
+                        "original_ref": pkg.get("original_ref", pkg.get("purl", f"{pkg['name']}@{pkg['version']}")),
+                        "licenses": pkg.get("licenses", ""),
+                        "component_type": pkg.get("component_type", "library"),
+                        "description": pkg.get("description", ""),
+                        "match_status": "unique",  # Default, will be updated during merge
+                        "primary": pkg.get("primary", "false")
+                    }
+                    for scanner_name, packages in packages_by_scanner.items()
                     for pkg in packages
                 ]
                 
-                session.add_all(package_objects)
-                await session.commit()
+                for start in range(0, len(package_rows), INSERT_BATCH_SIZE):
+                    await session.execute(insert(Package), package_rows[start:start + INSERT_BATCH_SIZE])
                 
-                logger.info(f"Saved {len(packages)} packages for scan {scan_id}, scanner {scanner_name}")
+                for scanner_name, packages in packages_by_scanner.items():
+                    logger.info(f"Saved {len(packages)} packages for scan {scan_id}, scanner {scanner_name}")
                 return True
         except Exception as e:
-            logger.error(f"Error saving packages for scan {scan_id}, scanner {scanner_name}: {e}")
+            logger.error(f"Error saving packages for scan {scan_id}, scanners {', '.join(scanner_names)}: {e}")
             import traceback
             logger.error(f"Full traceback: {traceback.format_exc()}")
+            if not owns_session:
+                raise
             return False
     
-    async def save_dependencies(self, scan_id: str, scanner_name: str, dependencies: List[Dict[str, str]]) -> bool:
+    async def get_packages(self, scan_id: str, scanner_name: str) -> List[Dict[str, Any]]:
+        """
+        Get the persisted packages for a specific scan and scanner,
+        in the same shape extract_packages produces them.
+        """
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(Package)
+                    .where(Package.scan_id == scan_id, Package.scanner_name == scanner_name)
+                    .order_by(Package.id)
+                )
+                return [
+                    {
+                        "name": pkg.name,
+                        "version": pkg.version,
+                        "purl": pkg.purl or "",
+                        "cpe": pkg.cpe or "",
+                        "original_ref": pkg.original_ref,
+                        "licenses": pkg.licenses or "",
+                        "component_type": pkg.component_type,
+                        "description": pkg.description or "",
+                        "primary": pkg.primary
+                    }
+                    for pkg in result.scalars().all()
+                ]
+        except Exception as e:
+            logger.error(f"Error getting packages for scan {scan_id}, scanner {scanner_name}: {e}")
+            return []
+    
+    async def save_dependencies(
+        self,
+        scan_id: str,
+        scanner_name: str,
+        dependencies: List[Dict[str, str]],
+        session: Optional[AsyncSession] = None
+    ) -> bool:
         """
         Save dependencies for a specific scan and scanner.
         Links packages using their original_ref values.
+        Errors are re-raised when a session is passed in, so the caller's transaction is not committed half-done.
         """
+        owns_session = session is None
         try:
-            async with AsyncSessionLocal() as session:
+            async with self._session(session) as session:
                 
                 
                 # First, delete existing dependencies for this scan_id and scanner
@@ -369,31 +551,33 @@ class DatabaseService:
                 )
                 ref_to_id = {row.original_ref: row.id for row in result.fetchall()}
                 
-                # Create dependency objects
-                dependency_objects = []
+                # Build dependency rows
+                dependency_rows = []
                 for dep in dependencies:
                     parent_id = ref_to_id.get(dep["parent_ref"])
                     child_id = ref_to_id.get(dep["child_ref"])
                     
                     if parent_id and child_id:
-                        dependency_objects.append(Dependency(
-                            scan_id=scan_id,
-                            scanner_name=scanner_name,
-                            parent_id=parent_id,
-                            child_id=child_id,
-                            original_type=dep["original_type"],
-                            normalized_type=dep["normalized_type"]
-                        ))
-                
-                session.add_all(dependency_objects)
-                await session.commit()
+                        dependency_rows.append({
+                            "scan_id": scan_id,
+                            "scanner_name": scanner_name,
+                            "parent_id": parent_id,
+                            "child_id": child_id,
+                            "original_type": dep["original_type"],
+                            "normalized_type": dep["normalized_type"]
+                        })
                 
-                logger.info(f"Saved {len(dependency_objects)} dependencies for scan {scan_id}, scanner {scanner_name}")
+                for start in range(0, len(dependency_rows), INSERT_BATCH_SIZE):
+                    await session.execute(insert(Dependency), dependency_rows[start:start + INSERT_BATCH_SIZE])
+                
+                logger.info(f"Saved {len(dependency_rows)} dependencies for scan {scan_id}, scanner {scanner_name}")
                 return True
         except Exception as e:
             logger.error(f"Error saving dependencies for scan {scan_id}, scanner {scanner_name}: {e}")
             import traceback
             logger.error(f"Full traceback: {traceback.format_exc()}")
+            if not owns_session:
+                raise
             return False
     
     async def find_exact_matches(self, scan_id: str) -> Dict[str, Any]:
@@ -463,20 +647,27 @@ class DatabaseService:
         Find fuzzy matches using hybrid approach:
         1. Use pg_trgm to filter candidates (fast but inaccurate)
         2. Use normalized Levenshtein distance for final scoring (accurate)
-        Excludes exact matches to avoid duplicates.
+        Excludes exact matches to avoid duplicates, and skips scanner pairs whose
+        exact overlap already reaches FUZZY_SKIP_EXACT_RATIO.
         """
         try:
             async with AsyncSessionLocal() as session:
                 # Hybrid fuzzy matching: pg_trgm filter + normalized Levenshtein scoring
                 query = text("""
                     WITH distinct_packages AS (
-                        -- Get all unique package/scanner combinations
-                        SELECT DISTINCT 
+                        -- Get all unique package/scanner combinations,
+                        -- with trigram counts used to block candidate pairs below
+                        SELECT 
                             name,
                             version,
-                            scanner_name
-                        FROM packages
-                        WHERE scan_id = :scan_id
+                            scanner_name,
+                            COALESCE(array_length(show_trgm(name), 1), 0) as name_trgms,
+                            COALESCE(array_length(show_trgm(version), 1), 0) as version_trgms
+                        FROM (
+                            SELECT DISTINCT name, version, scanner_name
+                            FROM packages
+                            WHERE scan_id = :scan_id
+                        ) dp
                     ),
                     exact_match_pairs AS (
                         -- Find exact match pairs to exclude from fuzzy matching
@@ -493,6 +684,20 @@ class DatabaseService:
                             AND p1.version = p2.version
                             AND p1.scanner_name < p2.scanner_name
                     ),
+                    scanner_sizes AS (
+                        SELECT scanner_name, COUNT(*) as package_count
+                        FROM distinct_packages
+                        GROUP BY scanner_name
+                    ),
+                    skipped_pairs AS (
+                        -- Scanner pairs that mostly agree exactly have little left to fuzzy match
+                        SELECT emp.scanner1, emp.scanner2
+                        FROM exact_match_pairs emp
+                        JOIN scanner_sizes s1 ON s1.scanner_name = emp.scanner1
+                        JOIN scanner_sizes s2 ON s2.scanner_name = emp.scanner2
+                        GROUP BY emp.scanner1, emp.scanner2, s1.package_count, s2.package_count
+                        HAVING COUNT(*) >= :skip_ratio * LEAST(s1.package_count, s2.package_count)
+                    ),
                     fuzzy_candidates AS (
                         -- Use pg_trgm for fast filtering (threshold 0.7)
                         SELECT DISTINCT
@@ -514,59 +719,56 @@ class DatabaseService:
                             AND p2.name = emp.name2 
                             AND p2.version = emp.version2 
                             AND p2.scanner_name = emp.scanner2
+                        LEFT JOIN skipped_pairs sp ON 
+                            p1.scanner_name = sp.scanner1
+                            AND p2.scanner_name = sp.scanner2
                         WHERE 
                             emp.name1 IS NULL  -- Exclude pairs that are already exact matches
+                            AND sp.scanner1 IS NULL
+                            -- Trigram similarity can't exceed min/max of the trigram counts, so these
+                            -- integer checks drop most pairs before similarity() is computed
+                            AND LEAST(p1.name_trgms, p2.name_trgms) > 0.7 * GREATEST(p1.name_trgms, p2.name_trgms)
+                            AND LEAST(p1.version_trgms, p2.version_trgms) > 0.5 * GREATEST(p1.version_trgms, p2.version_trgms)
                             AND similarity(p1.name, p2.name) > 0.7
                             AND similarity(p1.version, p2.version) > 0.5
                             AND (p1.name != p2.name OR p1.version != p2.version)  -- Exclude identical pairs
-                    )
-                    -- Final scoring with normalized Levenshtein distance
-                    -- Similarity = 1 - (levenshtein_distance / max_length)
-                    SELECT 
-                        name1,
-                        version1,
-                        scanner1,
-                        name2,
-                        version2,
-                        scanner2,
-                        trgm_name_sim,
-                        trgm_version_sim,
-                        CASE 
-                            WHEN GREATEST(LENGTH(name1), LENGTH(name2)) = 0 THEN 0
-                            ELSE 1.0 - (CAST(levenshtein(name1, name2) AS FLOAT) / GREATEST(LENGTH(name1), LENGTH(name2)))
-                        END as name_similarity,
-                        CASE 
-                            WHEN GREATEST(LENGTH(version1), LENGTH(version2)) = 0 THEN 0
-                            ELSE 1.0 - (CAST(levenshtein(version1, version2) AS FLOAT) / GREATEST(LENGTH(version1), LENGTH(version2)))
-                        END as version_similarity,
-                        (
+                    ),
+                    scored AS MATERIALIZED (
+                        -- Final scoring with normalized Levenshtein distance, computed once per pair
+                        -- (MATERIALIZED keeps Postgres from inlining and re-evaluating it in the filter)
+                        -- Similarity = 1 - (levenshtein_distance / max_length)
+                        SELECT 
+                            name1,
+                            version1,
+                            scanner1,
+                            name2,
+                            version2,
+                            scanner2,
+                            trgm_name_sim,
+                            trgm_version_sim,
                             CASE 
                                 WHEN GREATEST(LENGTH(name1), LENGTH(name2)) = 0 THEN 0
                                 ELSE 1.0 - (CAST(levenshtein(name1, name2) AS FLOAT) / GREATEST(LENGTH(name1), LENGTH(name2)))
-                            END +
+                            END as name_similarity,
                             CASE 
                                 WHEN GREATEST(LENGTH(version1), LENGTH(version2)) = 0 THEN 0
                                 ELSE 1.0 - (CAST(levenshtein(version1, version2) AS FLOAT) / GREATEST(LENGTH(version1), LENGTH(version2)))
-                            END
-                        ) / 2 as overall_similarity
-                    FROM fuzzy_candidates
-                    WHERE (
-                        CASE 
-                            WHEN GREATEST(LENGTH(name1), LENGTH(name2)) = 0 THEN 0
-                            ELSE 1.0 - (CAST(levenshtein(name1, name2) AS FLOAT) / GREATEST(LENGTH(name1), LENGTH(name2)))
-                        END +
-                        CASE 
-                            WHEN GREATEST(LENGTH(version1), LENGTH(version2)) = 0 THEN 0
-                            ELSE 1.0 - (CAST(levenshtein(version1, version2) AS FLOAT) / GREATEST(LENGTH(version1), LENGTH(version2)))
-                        END
-                    ) / 2 > :threshold
+                            END as version_similarity
+                        FROM fuzzy_candidates
+                    )
+                    SELECT 
+                        *,
+                        (name_similarity + version_similarity) / 2 as overall_similarity
+                    FROM scored
+                    WHERE (name_similarity + version_similarity) / 2 > :threshold
                     ORDER BY overall_similarity DESC
                     LIMIT 1000
                 """)
                 
                 result = await session.execute(query, {
                     "scan_id": scan_id,
-                    "threshold": similarity_threshold
+                    "threshold": similarity_threshold,
+                    "skip_ratio": FUZZY_SKIP_EXACT_RATIO
                 })
                 rows = result.fetchall()
                 
@@ -605,31 +807,17 @@ class DatabaseService:
             async with AsyncSessionLocal() as session:
                 # Find packages that only appear in one scanner
                 query = text("""
-                    WITH package_scanners AS (
-                        SELECT DISTINCT 
-                            name,
-                            version,
-                            scanner_name
-                        FROM packages
-                        WHERE scan_id = :scan_id
-                    ),
-                    scanner_counts AS (
-                        SELECT 
-                            name,
-                            version,
-                            COUNT(DISTINCT scanner_name) as num_scanners,
-                            array_agg(DISTINCT scanner_name) as scanners
-                        FROM package_scanners
-                        GROUP BY name, version
-                    )
+                    -- One aggregate pass: a (name, version) seen by a single scanner
+                    -- has MIN(scanner_name) equal to that scanner
                     SELECT 
-                        ps.name,
-                        ps.version,
-                        ps.scanner_name
-                    FROM package_scanners ps
-                    JOIN scanner_counts sc ON ps.name = sc.name AND ps.version = sc.version
-                    WHERE sc.num_scanners = 1
-                    ORDER BY ps.scanner_name, ps.name
+                        name,
+                        version,
+                        MIN(scanner_name) as scanner_name
+                    FROM packages
+                    WHERE scan_id = :scan_id
+                    GROUP BY name, version
+                    HAVING COUNT(DISTINCT scanner_name) = 1
+                    ORDER BY scanner_name, name
                 """)
                 
                 result = await session.execute(query, {"scan_id": scan_id})
@@ -702,14 +890,14 @@ class DatabaseService:
             # Check for cached analysis first
             if use_cache:
                 async with AsyncSessionLocal() as session:
-                    result = await session.execute(
-                        select(ScanResultsDB).where(ScanResultsDB.scan_id == scan_id)
+                    # Only read the cache column; the row also holds every scanner SBOM
+                    cached_analysis = await session.scalar(
+                        select(ScanResultsDB.cached_analysis).where(ScanResultsDB.scan_id == scan_id)
                     )
-                    db_scan = result.scalar_one_or_none()
                     
-                    if db_scan and db_scan.cached_analysis:
+                    if cached_analysis:
                         logger.info(f"Using cached analysis for scan {scan_id}")
-                        return db_scan.cached_analysis
+                        return cached_analysis
             
             # If no cache or use_cache=False, perform analysis
             logger.info(f"Computing fresh analysis for scan {scan_id}")
@@ -778,13 +966,13 @@ class DatabaseService:
         try:
             async with AsyncSessionLocal() as session:
                 result = await session.execute(
-                    select(ScanResultsDB).where(ScanResultsDB.scan_id == scan_id)
+                    update(ScanResultsDB)
+                    .where(ScanResultsDB.scan_id == scan_id)
+                    .values(cached_analysis=analysis_data)
                 )
-                db_scan = result.scalar_one_or_none()
+                await session.commit()
                 
-                if db_scan:
-                    db_scan.cached_analysis = analysis_data
-                    await session.commit()
+                if result.rowcount:
                     logger.info(f"Cached analysis results for scan {scan_id}")
                     return True
                 else:
@@ -805,13 +993,13 @@ class DatabaseService:
         try:
             async with AsyncSessionLocal() as session:
                 result = await session.execute(
-                    select(ScanResultsDB).where(ScanResultsDB.scan_id == scan_id)
+                    update(ScanResultsDB)
+                    .where(ScanResultsDB.scan_id == scan_id)
+                    .values(cached_analysis=None)
                 )
-                db_scan = result.scalar_one_or_none()
+                await session.commit()
                 
-                if db_scan:
-                    db_scan.cached_analysis = None
-                    await session.commit()
+                if result.rowcount:
                     logger.info(f"Invalidated analysis cache for scan {scan_id}")
                     return True
                 else:
@@ -1,6 +1,10 @@
 import logging
+import hashlib
 import httpx
-from typing import Optional, Dict, Any
+import orjson
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -10,9 +14,22 @@ class GithubService:
     
     BASE_URL = "https://api.github.com"
     API_VERSION = "2022-11-28"
+    SBOM_CACHE_SIZE = 128
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         self.logger = logging.getLogger(__name__)
+        self.http_client = http_client
+        # (url, token hash) -> (etag, sbom); revalidated with If-None-Match on every fetch
+        self._sbom_cache: "OrderedDict[Tuple[str, str], Tuple[str, Dict[str, Any]]]" = OrderedDict()
+    
+    @asynccontextmanager
+    async def _client(self):
+        """Yield the shared HTTP client if one was provided, else a short-lived one."""
+        if self.http_client:
+            yield self.http_client
+        else:
+            async with httpx.AsyncClient() as client:
+                yield client
     
     def _parse_repo_url(self, repo_url: str) -> tuple[str, str]:
         """
@@ -63,14 +80,36 @@ class GithubService:
         if github_token:
             headers["Authorization"] = f"Bearer {github_token}"
         
+        # Key on the token too, so one caller's private SBOM is never served to another
+        token_hash = hashlib.sha256(github_token.encode("utf-8")).hexdigest() if github_token else ""
+        cache_key = (url, token_hash)
+        cached = self._sbom_cache.get(cache_key)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        
         logger.info(f"Fetching SBOM from GitHub for {owner}/{repo}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with self._client() as client:
             try:
-                response = await client.get(url, headers=headers)
+                response = await client.get(url, headers=headers, timeout=30.0)
+                
+                # 304s don't count against the rate limit and skip the download and parse
+                if response.status_code == 304 and cached:
+                    self._sbom_cache.move_to_end(cache_key)
+                    logger.info(f"GitHub SBOM for {owner}/{repo} unchanged, using cached copy")
+                    return cached[1]
+                
                 response.raise_for_status()
                 
-                sbom_data = response.json()
+                sbom_data = orjson.loads(response.content)
+                
+                etag = response.headers.get("ETag")
+                if etag:
+                    self._sbom_cache[cache_key] = (etag, sbom_data)
+                    self._sbom_cache.move_to_end(cache_key)
+                    if len(self._sbom_cache) > self.SBOM_CACHE_SIZE:
+                        self._sbom_cache.popitem(last=False)
+                
                 logger.info(f"Successfully fetched SBOM from GitHub for {owner}/{repo}")
                 return sbom_data
                 
@@ -9,6 +9,22 @@ class PackageAnalyze:
     All comparison logic moved to DatabaseService for SQL-based analysis.
     """
     
+    # Map SPDX primaryPackagePurpose to CycloneDX component type
+    SPDX_PURPOSE_TYPES = {
+        "APPLICATION": "application",
+        "FRAMEWORK": "framework",
+        "LIBRARY": "library",
+        "CONTAINER": "container",
+        "OPERATING-SYSTEM": "operating-system",
+        "DEVICE": "device",
+        "FIRMWARE": "firmware",
+        "FILE": "file",
+        "SOURCE": "library",  # Map to library
+        "ARCHIVE": "library",  # Map to library
+        "INSTALL": "library",  # Map to library
+        "OTHER": "library"  # Map to library
+    }
+    
     def extract_packages(self, sbom_data: Dict, scanner: ScannerType) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
         """
         Extract package data and dependencies from CycloneDX SBOM.
@@ -142,22 +158,7 @@ class PackageAnalyze:
             component_type = "library"  # Default
             primary_purpose = package.get("primaryPackagePurpose", "").upper()
             if primary_purpose:
-                # Map SPDX primaryPackagePurpose to CycloneDX component type
-                purpose_map = {
-                    "APPLICATION": "application",
-                    "FRAMEWORK": "framework",
-                    "LIBRARY": "library",
-                    "CONTAINER": "container",
-                    "OPERATING-SYSTEM": "operating-system",
-                    "DEVICE": "device",
-                    "FIRMWARE": "firmware",
-                    "FILE": "file",
-                    "SOURCE": "library",  # Map to library
-                    "ARCHIVE": "library",  # Map to library
-                    "INSTALL": "library",  # Map to library
-                    "OTHER": "library"  # Map to library
-                }
-                component_type = purpose_map.get(primary_purpose, "library")
+                component_type = self.SPDX_PURPOSE_TYPES.get(primary_purpose, "library")
             
             if name:
                 # Check if this is the primary package
@@ -221,15 +222,15 @@ class PackageAnalyze:
     def parse_sbom_graph(self, sbom_data: Dict) -> Dict[str, Any]:
         """Parse CycloneDX SBOM to extract graph data for visualization."""
         nodes = []
-        edges = []
-        node_map = {}  # Map purl to node index
+        node_ids = set()  # purls that became nodes, for edge filtering
         
-        for i, component in enumerate(sbom_data.get("components", [])):
+        for component in sbom_data.get("components", []):
             purl = component.get("purl", "")
             if not purl:
                 continue
-                
-            node = {
+            
+            licenses = component.get("licenses")
+            nodes.append({
                 "id": purl,
                 "label": component.get("name", "Unknown"),
                 "properties": {
@@ -238,27 +239,24 @@ class PackageAnalyze:
                     "purl": purl,
                     "type": component.get("type", ""),
                     "description": component.get("description", ""),
-                    "licenses": [lic.get("license", {}).get("id", "") for lic in component.get("licenses", []) if lic.get("license")],
+                    "licenses": [lic.get("license", {}).get("id", "") for lic in licenses if lic.get("license")] if licenses else [],
                     "hashes": component.get("hashes", []),
                     "externalReferences": component.get("externalReferences", [])
                 }
-            }
-            nodes.append(node)
-            node_map[purl] = i
+            })
+            node_ids.add(purl)
         
-        for dep in sbom_data.get("dependencies", []):
-            source_ref = dep.get("ref", "")
-            if source_ref not in node_map:
-                continue
-                
-            for target_ref in dep.get("dependsOn", []):
-                if target_ref in node_map:
-                    edge = {
-                        "source": source_ref,
-                        "target": target_ref,
-                        "type": "depends_on"
-                    }
-                    edges.append(edge)
+        edges = [
+            {
+                "source": source_ref,
+                "target": target_ref,
+                "type": "depends_on"
+            }
+            for dep in sbom_data.get("dependencies", [])
+            if (source_ref := dep.get("ref", "")) in node_ids
+            for target_ref in dep.get("dependsOn", [])
+            if target_ref in node_ids
+        ]
         
         return {
             "nodes": nodes,
@@ -0,0 +1,247 @@
+import os
+import time
+import fcntl
+import shutil
+import tempfile
+import hashlib
+import logging
+
+from contextlib import contextmanager
+from typing import Dict, Optional
+from git import Git, Remote, Repo
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Answers git's username/password prompts from the environment
+ASKPASS_SCRIPT = """#!/bin/sh
+case "$1" in
+    Username*) echo "$GIT_USERNAME" ;;
+    *) echo "$GIT_PASSWORD" ;;
+esac
+"""
+
+
+class RepoCache:
+    """
+    Clone cache keyed by repository URL.
+    Keeps one bare repository per URL and checks each scan out as a detached
+    worktree pinned to the resolved commit SHA, so repeat scans only fetch new objects.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or settings.CLONE_CACHE_DIR or os.path.join(settings.TEMP_DIR, "_cache")
+
+    def _bare_path(self, repo_url: str) -> str:
+        """Path of the bare repository backing the given URL."""
+        url_hash = hashlib.sha1(repo_url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{url_hash}.git")
+
+    def _check_repo_url(self, repo_url: str):
+        """
+        Reject URLs git could read as an option (e.g. --upload-pack=...) or that use
+        a transport other than https, since repo_url comes straight from the request.
+
+        Raises:
+            ValueError: If the URL is not an https URL
+            git.exc.UnsafeProtocolError / git.exc.UnsafeOptionError: From GitPython's own checks
+        """
+        if repo_url.startswith("-") or not repo_url.startswith("https://"):
+            raise ValueError(f"Unsupported repository URL: {repo_url}")
+        Git.check_unsafe_protocols(repo_url)
+        Git.check_unsafe_options(options=[repo_url], unsafe_options=Remote.unsafe_git_fetch_options)
+
+    def _git_env(self, github_token: Optional[str]) -> Dict[str, str]:
+        """
+        Environment for git commands. Prompts are always disabled so a private or
+        invalid repository fails instead of waiting on a terminal. A token is fed to
+        git through GIT_ASKPASS, keeping it out of the URL, the process command line
+        and the repo config.
+        """
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        if not github_token:
+            return env
+        
+        # git runs the helper from inside the repository, so the path must be absolute
+        askpass_path = os.path.abspath(os.path.join(self.cache_dir, "askpass.sh"))
+        if not os.path.exists(askpass_path):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Created executable and renamed into place, so concurrent scans never run a partial script
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".askpass-")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(ASKPASS_SCRIPT)
+                os.chmod(tmp_path, 0o700)
+                os.replace(tmp_path, askpass_path)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+        
+        return {
+            **env,
+            "GIT_ASKPASS": askpass_path,
+            "GIT_USERNAME": "x-access-token",
+            "GIT_PASSWORD": github_token
+        }
+
+    @contextmanager
+    def _locked(self, bare_path: str):
+        """Hold an exclusive file lock so parallel scans of one repo don't race on the bare repo."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(f"{bare_path}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _dir_size(self, path: str) -> int:
+        """Total size in bytes of the files under path."""
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.lstat(os.path.join(root, name)).st_size
+                except OSError:
+                    pass
+        return total
+
+    def _record_size(self, bare_path: str, commit_sha: str):
+        """
+        Store the bare repository's size in a file next to it, so eviction doesn't walk the whole cache.
+        The repository is only measured again when a new commit was fetched into it.
+        """
+        size_path = f"{bare_path}.size"
+        try:
+            with open(size_path) as f:
+                recorded_sha, _ = f.read().split()
+            if recorded_sha == commit_sha:
+                return
+        except (OSError, ValueError):
+            pass
+        with open(size_path, "w") as f:
+            f.write(f"{commit_sha} {self._dir_size(bare_path)}")
+
+    def _recorded_size(self, bare_path: str) -> int:
+        """Size stored by _record_size, measuring the repository if there is none."""
+        try:
+            with open(f"{bare_path}.size") as f:
+                return int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            return self._dir_size(bare_path)
+
+    def _has_live_worktrees(self, bare_path: str) -> bool:
+        """Whether a scan still has a worktree checked out from this bare repository."""
+        worktrees_dir = os.path.join(bare_path, "worktrees")
+        if not os.path.isdir(worktrees_dir):
+            return False
+
+        for name in os.listdir(worktrees_dir):
+            try:
+                with open(os.path.join(worktrees_dir, name, "gitdir")) as f:
+                    if os.path.exists(f.read().strip()):
+                        return True
+            except OSError:
+                continue
+        return False
+
+    def evict(self, max_bytes: Optional[int] = None):
+        """
+        Remove the least recently used bare repositories until the cache fits in max_bytes.
+        Repositories that are locked or still have live worktrees are skipped.
+        """
+        max_bytes = settings.MAX_CACHE_BYTES if max_bytes is None else max_bytes
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".git") and os.path.isdir(path):
+                entries.append((os.stat(path).st_mtime, path, self._recorded_size(path)))
+
+        total = sum(size for _, _, size in entries)
+        for _, bare_path, size in sorted(entries):
+            if total <= max_bytes:
+                break
+
+            with open(f"{bare_path}.lock", "w") as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                try:
+                    if self._has_live_worktrees(bare_path):
+                        continue
+                    shutil.rmtree(bare_path, ignore_errors=True)
+                    try:
+                        os.unlink(f"{bare_path}.size")
+                    except OSError:
+                        pass
+                    total -= size
+                    logger.info(f"Evicted {bare_path} from clone cache ({size} bytes)")
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def resolve_head(self, repo_url: str, github_token: Optional[str] = None) -> Optional[str]:
+        """
+        Resolve the remote HEAD to a commit SHA with ls-remote, without fetching anything.
+        Blocking - call through asyncio.to_thread from coroutines.
+
+        Returns:
+            The commit SHA, or None if the remote could not be queried
+
+        Raises:
+            ValueError: If repo_url is not a safe https URL
+        """
+        self._check_repo_url(repo_url)
+        try:
+            output = Git().ls_remote("--", repo_url, "HEAD", env=self._git_env(github_token))
+        except Exception as e:
+            logger.warning(f"ls-remote failed for {repo_url}: {e}")
+            return None
+        return output.split()[0] if output else None
+
+    def checkout(self, repo_url: str, repo_path: str, github_token: Optional[str] = None) -> str:
+        """
+        Fetch the remote HEAD into the cached bare repository and add a worktree for it.
+        Blocking - call through asyncio.to_thread from coroutines.
+
+        Args:
+            repo_url: Repository URL, used as the cache key
+            repo_path: Directory to create the worktree in
+            github_token: Token for private repositories
+
+        Returns:
+            The resolved commit SHA checked out at repo_path
+        """
+        self._check_repo_url(repo_url)
+        bare_path = self._bare_path(repo_url)
+        with self._locked(bare_path):
+            if os.path.isdir(bare_path):
+                logger.info(f"Reusing cached clone for {repo_url}")
+                bare = Repo(bare_path)
+            else:
+                logger.info(f"Creating clone cache for {repo_url}")
+                bare = Repo.init(bare_path, bare=True)
+
+            # Scanners only need the tip commit, so keep fetches shallow
+            bare.git.fetch("--depth=1", "--no-tags", "--", repo_url, "HEAD", env=self._git_env(github_token))
+            commit_sha = bare.git.rev_parse("FETCH_HEAD")
+
+            # Drop registrations of worktrees whose directories were already removed
+            bare.git.worktree("prune")
+            bare.git.worktree("add", "--detach", repo_path, commit_sha)
+            self._record_size(bare_path, commit_sha)
+            # mtime marks last use for LRU eviction
+            os.utime(bare_path, (time.time(), time.time()))
+
+        logger.info(f"Checked out {repo_url} at {commit_sha} into {repo_path}")
+
+        try:
+            self.evict()
+        except OSError as e:
+            logger.warning(f"Clone cache eviction failed: {e}")
+
+        return commit_sha
@@ -1,15 +1,18 @@
 import os
 import json
+import orjson
+import shutil
 import asyncio
-import subprocess
 import docker
+import httpx
 import uuid
 import logging
 import tempfile
+import multiprocessing
 
 from typing import Dict, Optional, List, Any, Tuple
 from datetime import datetime
-from git import Repo
+from concurrent.futures import ProcessPoolExecutor
 
 from app.schemas.scan import (
     ScanResults, ScanStatus, 
@@ -21,6 +24,8 @@ from app.utils.tech_stack import detect_tech_stack
 from app.services.package_analyze import PackageAnalyze
 from app.services.github_service import GithubService
 from app.services.bd_service import BDService
+from app.services.repo_cache import RepoCache
+from app.services.scanner_pool import ScannerPool
 from app.services.database_service import db_service
 
 from app.database import AsyncSessionLocal
@@ -28,12 +33,93 @@ from sqlalchemy import text
 
 logger = logging.getLogger(__name__)
 
+def _read_json_file(path: str) -> Dict[str, Any]:
+    """Read and parse a JSON file (blocking)."""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+# Local scanner CLIs: display name, argv builder (repo path, output path), timeout.
+# Trivy and Syft write the SBOM to stdout and get no output path; cdxgen has no
+# stdout mode, so it writes to a temp file.
+_LOCAL_SCANNERS = {
+    ScannerType.TRIVY: (
+        "Trivy",
+        lambda repo_path, _: ["trivy", "fs", "--quiet", "--format", "cyclonedx", repo_path],
+        settings.TRIVY_TIMEOUT
+    ),
+    ScannerType.SYFT: (
+        "Syft",
+        lambda repo_path, _: ["/usr/local/bin/syft", repo_path, "--quiet", "--output", "cyclonedx-json"],
+        settings.SYFT_TIMEOUT
+    ),
+    ScannerType.CDXGEN: (
+        "CDXGen",
+        lambda repo_path, output_path: ["cdxgen", "-o", output_path, "-r", repo_path],
+        settings.CDXGEN_TIMEOUT
+    )
+}
+
+# Scanners in _LOCAL_SCANNERS that need an output file
+_FILE_OUTPUT_SCANNERS = {ScannerType.CDXGEN}
+
 class SBOMService:
+    # ScanResults attribute holding each scanner's SBOMResult
+    _SCAN_ATTR = {
+        ScannerType.TRIVY: "trivy_sbom",
+        ScannerType.SYFT: "syft_sbom",
+        ScannerType.CDXGEN: "cdxgen_sbom",
+        ScannerType.GHAS: "ghas_sbom",
+        ScannerType.BLACKDUCK: "bd_sbom",
+        ScannerType.UPLOADED: "uploaded_sbom"
+    }
+
     def __init__(self):
         self.docker_client = docker.from_env()
         self.package_analyzer = PackageAnalyze()
-        self.github_service = GithubService()
-        self.bd_service = BDService()
+        # One keep-alive client for GitHub/Black Duck so repeat fetches reuse connections
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        )
+        self.github_service = GithubService(http_client=self.http_client)
+        self.bd_service = BDService(http_client=self.http_client)
+        self.repo_cache = RepoCache()
+        # Package extraction is pure-Python dict walking, so it needs processes to use more than one core.
+        # Started from the app lifespan (or on first use), not at import
+        self.extract_pool: Optional[ProcessPoolExecutor] = None
+        self.scanner_pool = None
+        if settings.SCANNER_POOL_SIZE > 0:
+            image = f"{settings.SCANNER_IMAGE}:{settings.SCANNER_IMAGE_TAG}"
+            if settings.DOCKER_REGISTRY:
+                image = f"{settings.DOCKER_REGISTRY}/{image}"
+            self.scanner_pool = ScannerPool(
+                self.docker_client,
+                image,
+                settings.SCANNER_POOL_SIZE,
+                settings.TEMP_DIR,
+                settings.SCANNER_POOL_HOST_TEMP_DIR
+            )
+
+    def start_extract_pool(self):
+        """Start the package extraction worker processes if they aren't running yet."""
+        if self.extract_pool is None:
+            # This process already runs threads (to_thread, docker SDK, DB pool), and a forked
+            # child can inherit their locks held; forkserver workers start from a clean process
+            self.extract_pool = ProcessPoolExecutor(
+                max_workers=settings.EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver")
+            )
+
+    async def _run_in_extract_pool(self, fn, *args):
+        """Run a CPU-bound PackageAnalyze method in the worker processes, off the event loop."""
+        self.start_extract_pool()
+        return await asyncio.get_running_loop().run_in_executor(self.extract_pool, fn, *args)
+
+    async def aclose(self):
+        """Release shared resources on application shutdown."""
+        await self.http_client.aclose()
+        if self.extract_pool is not None:
+            self.extract_pool.shutdown(wait=False, cancel_futures=True)
+            self.extract_pool = None
 
     async def start_scan(
         self, 
@@ -49,8 +135,7 @@ class SBOMService:
             scan_id=scan_id,
             status=ScanStatus.PENDING,
             repo_url=str(repo_url),
-            created_at=datetime.now(),
-            tech_stack=detect_tech_stack(str(repo_url), github_token)
+            created_at=datetime.now()
         )
         await db_service.save_scan_results(scan)
         return scan_id
@@ -71,105 +156,232 @@ class SBOMService:
 
         logger.info(f"Running scan {scan_id} for repo {scan.repo_url}")
         scan.status = ScanStatus.IN_PROGRESS
+        repo_path = self._scan_repo_path(scan_id)
         try:
-            logger.info(f"Cloning repo {scan.repo_url} for scan {scan_id}")
-            repo_path = os.path.join(settings.TEMP_DIR, scan_id)
-            os.makedirs(repo_path, exist_ok=True)
-            
-            if github_token:
-                auth_url = scan.repo_url.replace('https://', f'https://{github_token}@')
-                logger.info(f"Using authenticated URL for cloning")
-                Repo.clone_from(auth_url, repo_path)
-            else:
-                Repo.clone_from(scan.repo_url, repo_path)
-
             logger.info(f"Running scanners for scan {scan_id}")
-            trivy_result = await self._run_scanner(scan_id, ScannerType.TRIVY, repo_path)
-            syft_result = await self._run_scanner(scan_id, ScannerType.SYFT, repo_path)
-            cdxgen_result = await self._run_scanner(scan_id, ScannerType.CDXGEN, repo_path)
-            ghas_result = await self._run_scanner(scan_id, ScannerType.GHAS, repo_path, github_token, scan.repo_url)
-            bd_result = await self._run_scanner(
-                scan_id, 
-                ScannerType.BLACKDUCK, 
-                repo_path,
-                bd_project_name=bd_project_name,
-                bd_project_version=bd_project_version,
-                bd_api_token=bd_api_token
+            # Scanners are independent subprocesses/API calls, so run them concurrently;
+            # the GitHub and Black Duck fetches also overlap with the checkout
+            scanners = (ScannerType.TRIVY, ScannerType.SYFT, ScannerType.CDXGEN, ScannerType.GHAS, ScannerType.BLACKDUCK)
+            # Tech stack detection is GitHub API calls only, so it overlaps with the checkout too
+            tech_stack, local_results, ghas_result, bd_result = await asyncio.gather(
+                detect_tech_stack(scan.repo_url, github_token, http_client=self.http_client),
+                self._run_local_scanners(scan_id, scan, repo_path, github_token),
+                self._run_scanner(scan_id, ScannerType.GHAS, repo_path, github_token, scan.repo_url),
+                self._run_scanner(
+                    scan_id, 
+                    ScannerType.BLACKDUCK, 
+                    repo_path,
+                    bd_project_name=bd_project_name,
+                    bd_project_version=bd_project_version,
+                    bd_api_token=bd_api_token
+                ),
+                return_exceptions=True
             )
+            scan.tech_stack = None if isinstance(tech_stack, Exception) else tech_stack
+            # A failed checkout fails the whole scan
+            if isinstance(local_results, Exception):
+                raise local_results
+            results = [*local_results, ghas_result, bd_result]
+            # One failing scanner must not discard the others' results
+            trivy_result, syft_result, cdxgen_result, ghas_result, bd_result = [
+                SBOMResult(scanner=scanner, error=str(result)) if isinstance(result, Exception) else result
+                for scanner, result in zip(scanners, results)
+            ]
 
             scan.trivy_sbom = trivy_result
             scan.syft_sbom = syft_result
             scan.cdxgen_sbom = cdxgen_result
             scan.ghas_sbom = ghas_result
             scan.bd_sbom = bd_result
-            scan.status = ScanStatus.COMPLETED
-            scan.completed_at = datetime.now()
-            logger.info(f"Scan {scan_id} completed successfully")
-            
-            # Save updated scan results
-            await db_service.save_scan_results(scan)
-            
-            # Extract and save packages and dependencies for each scanner
-            logger.info(f"Extracting and saving packages and dependencies for scan {scan_id}")
-            if trivy_result and trivy_result.sbom:
-                trivy_packages, trivy_deps = self.package_analyzer.extract_packages(trivy_result.sbom, ScannerType.TRIVY)
-                await db_service.save_packages(scan_id, ScannerType.TRIVY.value, trivy_packages)
-                await db_service.save_dependencies(scan_id, ScannerType.TRIVY.value, trivy_deps)
-            
-            if syft_result and syft_result.sbom:
-                syft_packages, syft_deps = self.package_analyzer.extract_packages(syft_result.sbom, ScannerType.SYFT)
-                await db_service.save_packages(scan_id, ScannerType.SYFT.value, syft_packages)
-                await db_service.save_dependencies(scan_id, ScannerType.SYFT.value, syft_deps)
-            
-            if cdxgen_result and cdxgen_result.sbom:
-                cdxgen_packages, cdxgen_deps = self.package_analyzer.extract_packages(cdxgen_result.sbom, ScannerType.CDXGEN)
-                await db_service.save_packages(scan_id, ScannerType.CDXGEN.value, cdxgen_packages)
-                await db_service.save_dependencies(scan_id, ScannerType.CDXGEN.value, cdxgen_deps)
-
-            if ghas_result and ghas_result.sbom:
-                ghas_packages, ghas_deps = self.package_analyzer.extract_spdx_packages(ghas_result.sbom, ScannerType.GHAS)
-                await db_service.save_packages(scan_id, ScannerType.GHAS.value, ghas_packages)
-                await db_service.save_dependencies(scan_id, ScannerType.GHAS.value, ghas_deps)
-            
-            if bd_result and bd_result.sbom:
-                bd_packages, bd_deps = self.package_analyzer.extract_packages(bd_result.sbom, ScannerType.BLACKDUCK)
-                await db_service.save_packages(scan_id, ScannerType.BLACKDUCK.value, bd_packages)
-                await db_service.save_dependencies(scan_id, ScannerType.BLACKDUCK.value, bd_deps)
             
-            # Process uploaded SBOM if provided
+            # Process uploaded SBOM if provided; it is saved with the scanner results below
             if uploaded_sbom_content and uploaded_sbom_format:
                 logger.info(f"Processing uploaded SBOM for scan {scan_id}, format: {uploaded_sbom_format}")
-                uploaded_result = await self._process_uploaded_sbom_for_scan(
+                scan.uploaded_sbom = await self._process_uploaded_sbom_for_scan(
                     uploaded_sbom_content,
                     uploaded_sbom_format
                 )
-                scan.uploaded_sbom = uploaded_result
-                
-                if uploaded_result and uploaded_result.sbom:
-                    # Extract packages and dependencies based on format
-                    if uploaded_sbom_format.lower() == 'spdx':
-                        uploaded_packages, uploaded_deps = self.package_analyzer.extract_spdx_packages(
-                            uploaded_result.sbom, 
-                            ScannerType.UPLOADED
-                        )
-                    else:  # cyclonedx
-                        uploaded_packages, uploaded_deps = self.package_analyzer.extract_packages(
-                            uploaded_result.sbom, 
-                            ScannerType.UPLOADED
-                        )
-                    await db_service.save_packages(scan_id, ScannerType.UPLOADED.value, uploaded_packages)
-                    await db_service.save_dependencies(scan_id, ScannerType.UPLOADED.value, uploaded_deps)
-                    logger.info(f"Saved {len(uploaded_packages)} packages and {len(uploaded_deps)} dependencies from uploaded SBOM")
+            uploaded_extract = (
+                self.package_analyzer.extract_spdx_packages
+                if uploaded_sbom_format and uploaded_sbom_format.lower() == 'spdx'
+                else self.package_analyzer.extract_packages
+            )
+            
+            # Extract and save packages and dependencies for each scanner
+            logger.info(f"Extracting and saving packages and dependencies for scan {scan_id}")
+            extract_jobs = [
+                (scanner_result, extract)
+                for scanner_result, extract in (
+                    (trivy_result, self.package_analyzer.extract_packages),
+                    (syft_result, self.package_analyzer.extract_packages),
+                    (cdxgen_result, self.package_analyzer.extract_packages),
+                    (ghas_result, self.package_analyzer.extract_spdx_packages),
+                    (bd_result, self.package_analyzer.extract_packages),
+                    (scan.uploaded_sbom, uploaded_extract)
+                )
+                if scanner_result and scanner_result.sbom
+            ]
+            # Walking large SBOMs is slow, so extract in worker processes concurrently
+            extracted = await asyncio.gather(*[
+                self._run_in_extract_pool(extract, scanner_result.sbom, scanner_result.scanner)
+                for scanner_result, extract in extract_jobs
+            ])
+            
+            # Completion is committed in the same transaction as every package and dependency row,
+            # so an analysis can never see a COMPLETED scan with packages missing.
+            # The save helpers raise on a shared session, which rolls it back and fails the scan below.
+            scan.status = ScanStatus.COMPLETED
+            scan.completed_at = datetime.now()
+            async with AsyncSessionLocal() as session:
+                await db_service.save_scan_results(scan, session=session)
+                # Packages from every scanner go in as one batch; dependencies need their IDs afterwards
+                await db_service.save_packages_bulk(scan_id, {
+                    scanner_result.scanner.value: packages
+                    for (scanner_result, _), (packages, _) in zip(extract_jobs, extracted)
+                }, session=session)
+                for (scanner_result, _), (_, deps) in zip(extract_jobs, extracted):
+                    await db_service.save_dependencies(scan_id, scanner_result.scanner.value, deps, session=session)
+                await session.commit()
+            logger.info(f"Scan {scan_id} completed successfully")
             
             # Note: Merged SBOM will be created on-demand when user explicitly requests it via the UI
             logger.info(f"Scan {scan_id} completed. All packages and dependencies saved to database.")
 
             # await self._handle_reruns(scan_id)
         except Exception as e:
+            # completed_at may already be set if the final save was what failed
             scan.status = ScanStatus.FAILED
+            scan.completed_at = None
             await db_service.save_scan_results(scan)
-            logger.error(f"Scan {scan_id} failed: {e}")
+            logger.exception(f"Scan {scan_id} failed: {e}")
             print(f"Scan failed: {e}")
+        finally:
+            # rm -rf is much faster than shutil.rmtree on checkouts with many small files
+            try:
+                proc = await asyncio.create_subprocess_exec("rm", "-rf", repo_path)
+                removed = await proc.wait() == 0
+            except OSError:
+                removed = False
+            if not removed:
+                await asyncio.to_thread(shutil.rmtree, repo_path, ignore_errors=True)
+
+    async def _run_local_scanners(
+        self,
+        scan_id: str,
+        scan: ScanResults,
+        repo_path: str,
+        github_token: Optional[str] = None
+    ) -> List[Any]:
+        """
+        Check the repository out and run Trivy, Syft and CDXGen against it.
+        If every one of them already has a cached SBOM for the remote HEAD, the checkout is skipped.
+        Sets scan.commit_sha. Per-scanner exceptions are returned in place of results.
+        """
+        head_sha = await asyncio.to_thread(self.repo_cache.resolve_head, scan.repo_url, github_token)
+        if head_sha:
+            cached = await asyncio.gather(*[
+                db_service.get_cached_sbom(scanner, head_sha) for scanner in _LOCAL_SCANNERS
+            ])
+            if all(cached):
+                logger.info(f"All local scanner SBOMs cached for {scan.repo_url} at {head_sha}, skipping checkout")
+                scan.commit_sha = head_sha
+                return cached
+        
+        logger.info(f"Cloning repo {scan.repo_url} for scan {scan_id}")
+        if github_token:
+            logger.info(f"Using GitHub token for cloning")
+        
+        # Check out from the shared clone cache; git work blocks, so run it off the event loop
+        scan.commit_sha = await asyncio.to_thread(
+            self.repo_cache.checkout, scan.repo_url, repo_path, github_token
+        )
+        
+        return await asyncio.gather(*[
+            self._run_cached_scanner(scan_id, scanner, repo_path, scan.commit_sha)
+            for scanner in _LOCAL_SCANNERS
+        ], return_exceptions=True)
+
+    def _scratch_dir(self) -> str:
+        """
+        Directory for scan checkouts and scanner output files.
+        Prefers tmpfs so these are served from RAM. Pooled scanner
+        containers only see TEMP_DIR, so the pool always uses that.
+        """
+        if settings.SCAN_TMPFS_DIR and not self.scanner_pool and os.path.isdir(settings.SCAN_TMPFS_DIR):
+            return os.path.join(settings.SCAN_TMPFS_DIR, "sbomgen")
+        # Absolute, since pooled containers would resolve a relative path against their own WORKDIR
+        return os.path.abspath(settings.TEMP_DIR)
+
+    def _scan_repo_path(self, scan_id: str) -> str:
+        """Directory to check a scan's repository out into."""
+        return os.path.join(self._scratch_dir(), scan_id)
+
+    async def _run_cached_scanner(
+        self,
+        scan_id: str,
+        scanner: ScannerType,
+        repo_path: str,
+        commit_sha: Optional[str]
+    ) -> SBOMResult:
+        """
+        Run a local scanner, reusing its SBOM if this commit was already scanned.
+        Only successful results are cached.
+        """
+        if commit_sha:
+            cached = await db_service.get_cached_sbom(scanner, commit_sha)
+            if cached:
+                logger.info(f"Using cached {scanner.value} SBOM for scan {scan_id} (commit {commit_sha})")
+                return cached
+        
+        result = await self._run_scanner(scan_id, scanner, repo_path)
+        if commit_sha and result.sbom and not result.error:
+            await db_service.save_cached_sbom(commit_sha, result)
+        return result
+
+    async def _exec_scanner(self, cmd: List[str], timeout: int) -> Tuple[int, bytes, str]:
+        """
+        Run a scanner CLI and return (returncode, stdout, stderr).
+        stdout is left as raw bytes so SBOMs written to it can go straight to orjson.
+        Uses a warm pooled container when the scanner pool is enabled.
+        """
+        if self.scanner_pool:
+            return await asyncio.to_thread(self.scanner_pool.exec, cmd, timeout)
+        
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise Exception(f"{cmd[0]} timed out after {timeout} seconds")
+        
+        return proc.returncode, stdout, stderr.decode(errors="replace")
+
+    async def _run_local_scanner(self, scanner: ScannerType, repo_path: str) -> Dict[str, Any]:
+        """Run one of the local scanner CLIs against repo_path and return its parsed SBOM."""
+        name, build_cmd, timeout = _LOCAL_SCANNERS[scanner]
+        
+        if scanner not in _FILE_OUTPUT_SCANNERS:
+            returncode, stdout, stderr = await self._exec_scanner(build_cmd(repo_path, None), timeout)
+            if returncode != 0:
+                raise Exception(f"{name} failed: {stderr}")
+            return await asyncio.to_thread(orjson.loads, stdout)
+        
+        scratch_dir = self._scratch_dir()
+        os.makedirs(scratch_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(mode='w+', suffix='.json', dir=scratch_dir, delete=False) as temp_file:
+            temp_file_path = temp_file.name
+        try:
+            returncode, _, stderr = await self._exec_scanner(build_cmd(repo_path, temp_file_path), timeout)
+            if returncode != 0:
+                raise Exception(f"{name} failed: {stderr}")
+            return await asyncio.to_thread(_read_json_file, temp_file_path)
+        finally:
+            os.unlink(temp_file_path)
 
     async def _run_scanner(
         self, 
@@ -184,56 +396,9 @@ class SBOMService:
     ) -> SBOMResult:
         logger.info(f"Running {scanner.value} for scan {scan_id}")
         try:
-            if scanner == ScannerType.TRIVY:
-                with tempfile.NamedTemporaryFile(mode='w+', suffix='.json', delete=False) as temp_file:
-                    temp_file_path = temp_file.name
-                
-                result = subprocess.run(
-                    ["trivy", "fs", "--format", "cyclonedx", "--output", temp_file_path, repo_path],
-                    capture_output=True, text=True, timeout=settings.TRIVY_TIMEOUT
-                )
-                if result.returncode == 0:
-                    with open(temp_file_path, 'r') as f:
-                        sbom_data = json.load(f)
-                    component_count = len(sbom_data.get("components", []))
-                else:
-                    raise Exception(f"Trivy failed: {result.stderr}")
-                
-                os.unlink(temp_file_path)
-                    
-            elif scanner == ScannerType.SYFT:
-                with tempfile.NamedTemporaryFile(mode='w+', suffix='.json', delete=False) as temp_file:
-                    temp_file_path = temp_file.name
-                
-                result = subprocess.run(
-                    ["/usr/local/bin/syft", repo_path, "--output", f"cyclonedx-json={temp_file_path}"],
-                    capture_output=True, text=True, timeout=settings.SYFT_TIMEOUT
-                )
-                if result.returncode == 0:
-                    with open(temp_file_path, 'r') as f:
-                        sbom_data = json.load(f)
-                    component_count = len(sbom_data.get("components", []))
-                else:
-                    raise Exception(f"Syft failed: {result.stderr}")
-                
-                os.unlink(temp_file_path)
-                    
-            elif scanner == ScannerType.CDXGEN:
-                with tempfile.NamedTemporaryFile(mode='w+', suffix='.json', delete=False) as temp_file:
-                    temp_file_path = temp_file.name
-
-                result = subprocess.run(
-                    ["cdxgen", "-o", temp_file_path, "-r", repo_path],
-                    capture_output=True, text=True, timeout=settings.CDXGEN_TIMEOUT
-                )
-                if result.returncode == 0:
-                    with open(temp_file_path, 'r') as f:
-                        sbom_data = json.load(f)
-                    component_count = len(sbom_data.get("components", []))
-                else:
-                    raise Exception(f"CDXGen failed: {result.stderr}")
-                
-                os.unlink(temp_file_path)
+            if scanner in _LOCAL_SCANNERS:
+                sbom_data = await self._run_local_scanner(scanner, repo_path)
+                component_count = len(sbom_data.get("components", []))
 
             elif scanner == ScannerType.GHAS:
                 if not repo_url:
@@ -247,23 +412,9 @@ class SBOMService:
                 
                 # GitHub returns SPDX format with nested sbom structure
                 if "sbom" in sbom_data:
-                    actual_sbom = sbom_data["sbom"]
-                else:
-                    actual_sbom = sbom_data
-                
-                # Save to temp file for consistency with other scanners
-                with tempfile.NamedTemporaryFile(mode='w+', suffix='.json', delete=False) as temp_file:
-                    temp_file_path = temp_file.name
-                    json.dump(actual_sbom, temp_file, indent=2)
-                
-                # Verify file was written correctly
-                with open(temp_file_path, 'r') as f:
-                    sbom_data = json.load(f)
+                    sbom_data = sbom_data["sbom"]
                 
                 component_count = len(sbom_data.get("packages", []))
-                
-                # Clean up temp file
-                os.unlink(temp_file_path)
             
             elif scanner == ScannerType.BLACKDUCK:
                 if not all([bd_project_name, bd_project_version, bd_api_token]):
@@ -282,19 +433,7 @@ class SBOMService:
                     api_token=bd_api_token
                 )
                 
-                # Save to temp file for consistency
-                with tempfile.NamedTemporaryFile(mode='w+', suffix='.json', delete=False) as temp_file:
-                    temp_file_path = temp_file.name
-                    json.dump(sbom_data, temp_file, indent=2)
-                
-                # Verify file was written correctly
-                with open(temp_file_path, 'r') as f:
-                    sbom_data = json.load(f)
-                
                 component_count = len(sbom_data.get("components", []))
-                
-                # Clean up temp file
-                os.unlink(temp_file_path)
             
             else:
                 raise Exception(f"Unknown scanner type: {scanner.value}")
@@ -311,10 +450,7 @@ class SBOMService:
         return await db_service.get_scan_results(scan_id)
 
     async def get_scan_status(self, scan_id: str) -> Optional[str]:
-        scan = await db_service.get_scan_results(scan_id)
-        if not scan:
-            scan = await db_service.get_uploaded_scan_results(scan_id)
-        status = scan.status.value if scan else None
+        status = await db_service.get_scan_status(scan_id)
         logger.info(f"Status for scan {scan_id}: {status}")
         return status
     
@@ -322,18 +458,9 @@ class SBOMService:
         scan = await db_service.get_scan_results(scan_id)
         
         if scan:
-            if scanner == ScannerType.TRIVY:
-                return scan.trivy_sbom.sbom if scan.trivy_sbom else None
-            elif scanner == ScannerType.SYFT:
-                return scan.syft_sbom.sbom if scan.syft_sbom else None
-            elif scanner == ScannerType.CDXGEN:
-                return scan.cdxgen_sbom.sbom if scan.cdxgen_sbom else None
-            elif scanner == ScannerType.GHAS:
-                return scan.ghas_sbom.sbom if scan.ghas_sbom else None
-            elif scanner == ScannerType.BLACKDUCK:
-                return scan.bd_sbom.sbom if scan.bd_sbom else None
-            elif scanner == ScannerType.UPLOADED:
-                return scan.uploaded_sbom.sbom if scan.uploaded_sbom else None
+            attr = self._SCAN_ATTR.get(scanner)
+            sbom_result = getattr(scan, attr, None) if attr else None
+            return sbom_result.sbom if sbom_result else None
         
         if scanner == ScannerType.UPLOADED:
             uploaded_scan = await db_service.get_uploaded_scan_results(scan_id)
@@ -352,16 +479,17 @@ class SBOMService:
             use_cache: Whether to use cached analysis if available (default: True)
         """
         try:
-            # Check if this is an uploaded scan
-            uploaded_results = await self.get_uploaded_scan_results(scan_id)
+            # Check if this is an uploaded scan; the repository scan lookup only reads two columns,
+            # so it runs alongside rather than after
+            uploaded_results, summary = await asyncio.gather(
+                self.get_uploaded_scan_results(scan_id),
+                db_service.get_scan_summary(scan_id)
+            )
             if uploaded_results and uploaded_results.uploaded_sbom:
                 logger.info(f"Getting analysis for uploaded scan {scan_id}")
-                sbom_data = uploaded_results.uploaded_sbom.sbom
-                if sbom_data:
-                    # Extract packages and dependencies (extract_packages returns a tuple)
-                    pkg_list, deps_list = self.package_analyzer.extract_packages(sbom_data, ScannerType.UPLOADED)
-                    await db_service.save_packages(scan_id, ScannerType.UPLOADED.value, pkg_list)
-                    await db_service.save_dependencies(scan_id, ScannerType.UPLOADED.value, deps_list)
+                if uploaded_results.uploaded_sbom.sbom:
+                    # Packages were extracted and saved when the SBOM was uploaded
+                    pkg_list = await db_service.get_packages(scan_id, ScannerType.UPLOADED.value)
                     
                     return {
                         "packages": pkg_list,
@@ -373,15 +501,17 @@ class SBOMService:
                     }
             
             # Use SQL-based analysis for repository scans
-            results = await self.get_scan_results(scan_id)
-            if not results:
+            if not summary:
                 return {"error": "Scan not found"}
+            # Packages are only complete once the scan is, so don't run (and cache) the analysis before that
+            if summary["status"] != ScanStatus.COMPLETED:
+                return {"error": "Scan not completed", "status": summary["status"].value}
             
             # Get comprehensive analysis from database (with caching)
             analysis = await db_service.analyze_scan_packages(scan_id, use_cache=use_cache)
             
             # Add tech stack info
-            analysis["tech_stack"] = results.tech_stack
+            analysis["tech_stack"] = summary["tech_stack"]
             
             return analysis
         except Exception as e:
@@ -394,6 +524,7 @@ class SBOMService:
         if not sbom_data:
             return {"error": "SBOM not found for this scanner"}
         
+        # In-process: pickling the SBOM to a worker and the graph back costs more than the walk itself
         return self.package_analyzer.parse_sbom_graph(sbom_data)
     
     async def get_merged_sbom(self, scan_id: str, include_all_unique: bool = True, 
@@ -407,25 +538,30 @@ class SBOMService:
             include_all_unique: Whether to include all unique packages
             exclude_github_actions: Whether to exclude GitHub Actions packages
             force_regenerate: Force regeneration even if cached version exists
+        
+        Returns:
+            The merged SBOM, None if the scan does not exist, or an empty dict if the merge failed
         """
         try:
-            scan = await db_service.get_scan_results(scan_id)
-            if not scan:
-                logger.error(f"Scan {scan_id} not found")
-                return None
-            
-            # Check if merged SBOM already exists in database (unless forcing regeneration)
-            if not force_regenerate:                
-                async with AsyncSessionLocal() as session:
-                    result = await session.execute(
-                        text("SELECT merged_sbom FROM scan_results WHERE scan_id = :scan_id"),
-                        {"scan_id": scan_id}
-                    )
-                    row = result.fetchone()
-                    
-                    if row and row.merged_sbom:
-                        logger.info(f"Retrieved existing merged SBOM for scan {scan_id}")
-                        return row.merged_sbom
+            async with AsyncSessionLocal() as session:
+                # One query for both the existence check and the stored merged SBOM;
+                # the document is only read back when it will be returned
+                result = await session.execute(
+                    text("""
+                        SELECT CASE WHEN :load_merged THEN merged_sbom END AS merged_sbom
+                        FROM scan_results WHERE scan_id = :scan_id
+                    """),
+                    {"scan_id": scan_id, "load_merged": not force_regenerate}
+                )
+                row = result.fetchone()
+                if not row:
+                    logger.error(f"Scan {scan_id} not found")
+                    return None
+                
+                # Return the existing merged SBOM (unless forcing regeneration)
+                if row.merged_sbom:
+                    logger.info(f"Retrieved existing merged SBOM for scan {scan_id}")
+                    return row.merged_sbom
             
             # If not exists or force regenerate, create it
             logger.info(f"Creating merged SBOM for scan {scan_id} (include_all_unique={include_all_unique}, exclude_github_actions={exclude_github_actions})")
@@ -438,7 +574,7 @@ class SBOMService:
             
         except Exception as e:
             logger.error(f"Error getting merged SBOM for scan {scan_id}: {e}")
-            return None
+            return {}
     
     async def get_merged_sbom_with_selections(self, scan_id: str, 
                                               selected_unique_packages: Dict[str, list]) -> Optional[Dict[str, Any]]:
@@ -486,43 +622,40 @@ class SBOMService:
         await db_service.save_uploaded_scan_results(uploaded_scan)
         
         try:
-            # Save uploaded file temporarily
-            temp_dir = os.path.join(settings.TEMP_DIR, scan_id)
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            original_file_path = os.path.join(temp_dir, f"original_{filename}")
-            with open(original_file_path, 'wb') as f:
-                f.write(file_content)
-            
             # Process based on format
             if sbom_format.lower() == "spdx":
                 logger.info(f"Converting SPDX to CycloneDX for scan {scan_id}")
-                cyclonedx_file_path = os.path.join(temp_dir, f"converted_{filename}")
                 
-                # Convert SPDX to CycloneDX using cyclonedx-cli
-                result = subprocess.run([
+                # Convert SPDX to CycloneDX using cyclonedx-cli, streaming through stdin/stdout
+                proc = await asyncio.create_subprocess_exec(
                     "cyclonedx", "convert",
-                    "--input-file", original_file_path,
                     "--input-format", "spdxjson",
                     "--output-format", "json",
-                    "--output-file", cyclonedx_file_path
-                ], capture_output=True, text=True, timeout=30)
-                
-                if result.returncode != 0:
-                    logger.error(f"CycloneDX conversion failed for scan {scan_id}: {result.stderr}")
-                    raise Exception(f"Failed to convert SPDX to CycloneDX: {result.stderr}")
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                try:
+                    stdout, stderr = await asyncio.wait_for(
+                        proc.communicate(file_content),
+                        timeout=settings.CYCLONEDX_CONVERT_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+                    raise Exception("SPDX to CycloneDX conversion timed out")
                 
-                logger.info(f"CycloneDX conversion logs for scan {scan_id}: {result.stdout}")
+                if proc.returncode != 0:
+                    error_output = stderr.decode(errors='replace')
+                    logger.error(f"CycloneDX conversion failed for scan {scan_id}: {error_output}")
+                    raise Exception(f"Failed to convert SPDX to CycloneDX: {error_output}")
                 
-                # Load the converted file
-                with open(cyclonedx_file_path, 'r', encoding='utf-8') as f:
-                    sbom_data = json.load(f)
+                sbom_data = orjson.loads(stdout)
                     
             elif sbom_format.lower() == "cyclonedx":
                 logger.info(f"Processing CycloneDX SBOM for scan {scan_id}")
-                # Load the file directly as it's already in CycloneDX format
-                with open(original_file_path, 'r', encoding='utf-8') as f:
-                    sbom_data = json.load(f)
+                # Parse the upload directly as it's already in CycloneDX format
+                sbom_data = orjson.loads(file_content)
             else:
                 raise Exception(f"Unsupported SBOM format: {sbom_format}")
             
@@ -547,7 +680,9 @@ class SBOMService:
             
             # Extract and save packages and dependencies
             logger.info(f"Extracting and saving packages and dependencies from uploaded SBOM for scan {scan_id}")
-            uploaded_packages, uploaded_deps = self.package_analyzer.extract_packages(sbom_data, ScannerType.UPLOADED)
+            uploaded_packages, uploaded_deps = await self._run_in_extract_pool(
+                self.package_analyzer.extract_packages, sbom_data, ScannerType.UPLOADED
+            )
             await db_service.save_packages(scan_id, ScannerType.UPLOADED.value, uploaded_packages)
             await db_service.save_dependencies(scan_id, ScannerType.UPLOADED.value, uploaded_deps)
             
@@ -575,7 +710,7 @@ class SBOMService:
         """
         try:
             # Parse JSON content
-            sbom_data = json.loads(sbom_content.decode('utf-8'))
+            sbom_data = orjson.loads(sbom_content)
             
             # Count components based on format
             if sbom_format.lower() == 'spdx':
@@ -0,0 +1,103 @@
+import os
+import queue
+import atexit
+import logging
+import threading
+import docker
+
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ScannerPool:
+    """
+    Pool of long-lived scanner containers.
+    Scanner CLIs are run with exec_run in an idle container instead of being
+    cold-started per scan. The staging directory is mounted at the same path it
+    has in this process and commands run from it, so absolute repo and output
+    paths can be passed through unchanged.
+    """
+
+    def __init__(
+        self,
+        docker_client: docker.DockerClient,
+        image: str,
+        size: int,
+        staging_dir: str,
+        host_staging_dir: Optional[str] = None
+    ):
+        self.docker_client = docker_client
+        self.image = image
+        self.size = size
+        self.staging_dir = os.path.abspath(staging_dir)
+        self.host_staging_dir = host_staging_dir or self.staging_dir
+        self._containers = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def _ensure_started(self):
+        """Start the pool containers on first use."""
+        with self._lock:
+            if self._started:
+                return
+
+            logger.info(f"Starting {self.size} scanner containers from {self.image}")
+            for _ in range(self.size):
+                container = self.docker_client.containers.run(
+                    self.image,
+                    entrypoint=["tail", "-f", "/dev/null"],
+                    detach=True,
+                    volumes={self.host_staging_dir: {"bind": self.staging_dir, "mode": "rw"}}
+                )
+                self._containers.append(container)
+                self._idle.put(container)
+
+            atexit.register(self.shutdown)
+            self._started = True
+
+    @contextmanager
+    def _acquire(self):
+        """Borrow an idle container, blocking until one is free."""
+        self._ensure_started()
+        container = self._idle.get()
+        try:
+            yield container
+        finally:
+            self._idle.put(container)
+
+    def exec(self, cmd: List[str], timeout: int) -> Tuple[int, bytes, str]:
+        """
+        Run a scanner command in a pooled container.
+        Blocking - call through asyncio.to_thread from coroutines.
+
+        Returns:
+            (exit_code, raw stdout, stderr)
+        """
+        with self._acquire() as container:
+            # exec_run has no timeout of its own, so enforce it inside the container
+            exit_code, (stdout, stderr) = container.exec_run(
+                ["timeout", str(timeout), *cmd],
+                demux=True,
+                workdir=self.staging_dir
+            )
+
+        return (
+            exit_code,
+            stdout or b"",
+            (stderr or b"").decode("utf-8", errors="replace")
+        )
+
+    def shutdown(self):
+        """Remove all pool containers."""
+        for container in self._containers:
+            try:
+                container.remove(force=True)
+            except docker.errors.DockerException as e:
+                logger.warning(f"Failed to remove scanner container {container.id}: {e}")
+
+        self._containers.clear()
+        self._idle = queue.Queue()
+        self._started = False
@@ -1,288 +1,651 @@
 import os
+import re
+import httpx
+import orjson
+import asyncio
+import hashlib
+import time
 import tempfile
-import requests
 import fnmatch
 import logging
 
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, List, Dict, Optional, Pattern, Set, Tuple
 from git import Repo
 
 logger = logging.getLogger(__name__)
 
-def detect_tech_stack(repo_url: str, github_token: Optional[str] = None) -> List[str]:
+# repo_url -> (HEAD commit SHA, tech stack) of the last detection; reused while HEAD hasn't moved
+TECH_STACK_CACHE_SIZE = 256
+_tech_stack_cache: "OrderedDict[str, Tuple[str, List[str]]]" = OrderedDict()
+# Recent results keyed by (owner, repo, token hash), served without any HTTP
+# for TECH_STACK_TTL_SECONDS, even before the HEAD SHA is checked
+TECH_STACK_TTL_SECONDS = 300
+_recent_tech_stacks: "OrderedDict[Tuple[str, str, str], Tuple[float, List[str]]]" = OrderedDict()
+# Repositories that returned 404 for a token, keyed like _recent_tech_stacks -> expiry time
+UNREACHABLE_TTL_SECONDS = 300
+_unreachable_repos: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+
+# (url, token hash) -> (etag, parsed body) for REST responses, revalidated with If-None-Match
+ETAG_CACHE_SIZE = 1024
+_etag_cache: "OrderedDict[Tuple[str, str], Tuple[str, Any]]" = OrderedDict()
+
+# Media types for the contents API's file text and the commits API's bare SHA
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+SHA_MEDIA_TYPE = "application/vnd.github.sha"
+
+# Requests left below which calls against a rate limit are skipped until it resets
+RATE_LIMIT_FLOOR = 10
+# Back-off for a secondary rate limit whose Retry-After can't be parsed
+DEFAULT_RETRY_AFTER_SECONDS = 60
+# (token hash, rate limit resource) -> epoch time at which the nearly spent budget resets
+_rate_limit_resets: Dict[Tuple[str, str], float] = {}
+
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+# Everything detection reads from a repository, fetched in one round trip
+REPO_DATA_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef { target { oid } }
+    languages(first: 100) { nodes { name } }
+    root: object(expression: "HEAD:") { ... on Tree { entries { name type } } }
+    pkg: object(expression: "HEAD:package.json") { ... on Blob { text } }
+    req: object(expression: "HEAD:requirements.txt") { ... on Blob { text } }
+    setup: object(expression: "HEAD:setup.py") { ... on Blob { text } }
+    gem: object(expression: "HEAD:Gemfile") { ... on Blob { text } }
+    composer: object(expression: "HEAD:composer.json") { ... on Blob { text } }
+    workflows: object(expression: "HEAD:.github/workflows") { ... on Tree { entries { name } } }
+  }
+}
+"""
+
+# Query alias -> manifest path
+GRAPHQL_MANIFESTS = {
+    "pkg": "package.json",
+    "req": "requirements.txt",
+    "setup": "setup.py",
+    "gem": "Gemfile",
+    "composer": "composer.json"
+}
+
+# Files whose presence in the repository root marks a technology
+TECH_INDICATORS = {
+    "python": ("requirements.txt", "setup.py", "Pipfile", "pyproject.toml", "poetry.lock", "environment.yml", "conda.yml"),
+    "nodejs": ("package.json", "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "bun.lockb"),
+    "java": ("pom.xml", "build.gradle", "build.gradle.kts", "build.xml", "settings.gradle"),
+    "go": ("go.mod", "go.sum", "Gopkg.toml", "Gopkg.lock"),
+    "rust": ("Cargo.toml", "Cargo.lock"),
+    "dotnet": ("*.csproj", "*.fsproj", "*.vbproj", "*.sln", "nuget.config"),
+    "ruby": ("Gemfile", "Gemfile.lock", "*.gemspec"),
+    "php": ("composer.json", "composer.lock"),
+    "docker": ("Dockerfile", "docker-compose.yml", "docker-compose.yaml", ".dockerignore"),
+    "kubernetes": ("*.yaml", "*.yml", "kustomization.yaml"),
+    "terraform": ("*.tf", "*.tfvars", "terraform.tfstate"),
+    "typescript": ("tsconfig.json", "*.ts", "*.tsx"),
+    "react": ("package.json",),
+    "vue": ("vue.config.js", "nuxt.config.js", "nuxt.config.ts"),
+    "angular": ("angular.json", "ng-package.json"),
+    "flutter": ("pubspec.yaml", "pubspec.lock"),
+    "swift": ("Package.swift", "*.xcodeproj", "*.xcworkspace", "Podfile"),
+    "kotlin": ("build.gradle.kts", "settings.gradle.kts"),
+    "scala": ("build.sbt", "*.scala"),
+    "elixir": ("mix.exs", "mix.lock"),
+    "clojure": ("project.clj", "deps.edn", "build.boot"),
+    "haskell": ("*.cabal", "stack.yaml", "cabal.project"),
+    "r": ("DESCRIPTION", "*.Rproj", "renv.lock"),
+    "julia": ("Project.toml", "Manifest.toml"),
+    "dart": ("pubspec.yaml", "pubspec.lock"),
+    "perl": ("Makefile.PL", "Build.PL", "cpanfile"),
+    "c/c++": ("CMakeLists.txt", "Makefile", "*.vcxproj", "meson.build"),
+    "mongodb": ("*.mongodb", "mongod.conf"),
+    "postgres": ("*.sql", "postgresql.conf"),
+    "redis": ("redis.conf", "*.rdb"),
+    "nginx": ("nginx.conf", "*.nginx"),
+    "apache": ("httpd.conf", ".htaccess"),
+    "cmake": ("CMakeLists.txt", "*.cmake"),
+    "make": ("Makefile", "GNUmakefile"),
+    "ansible": ("ansible.cfg", "playbook.yml", "inventory.ini"),
+    "jenkins": ("Jenkinsfile", "jenkins.yaml"),
+    "gitlab-ci": (".gitlab-ci.yml",),
+    "github-actions": (".github/workflows/*.yml", ".github/workflows/*.yaml"),
+    "circleci": (".circleci/config.yml",),
+    "travis-ci": (".travis.yml",),
+    "webpack": ("webpack.config.js", "webpack.config.ts"),
+    "vite": ("vite.config.js", "vite.config.ts"),
+    "rollup": ("rollup.config.js", "rollup.config.mjs"),
+    "babel": (".babelrc", "babel.config.js", "babel.config.json"),
+    "eslint": (".eslintrc", ".eslintrc.js", ".eslintrc.json", "eslint.config.js"),
+    "prettier": (".prettierrc", "prettier.config.js"),
+    "jest": ("jest.config.js", "jest.config.ts"),
+    "pytest": ("pytest.ini", "pyproject.toml"),
+    "maven": ("pom.xml",),
+    "gradle": ("build.gradle", "build.gradle.kts", "settings.gradle"),
+    "npm": ("package.json",),
+    "pip": ("requirements.txt", "setup.py"),
+    "conda": ("environment.yml", "conda.yml"),
+    "poetry": ("pyproject.toml", "poetry.lock")
+}
+
+# Language to framework mapping
+LANGUAGE_FRAMEWORKS = {
+    "Python": ("python", "django", "flask", "fastapi"),
+    "JavaScript": ("nodejs", "javascript"),
+    "TypeScript": ("typescript", "nodejs"),
+    "Java": ("java", "spring"),
+    "Go": ("go",),
+    "Rust": ("rust",),
+    "C#": ("dotnet", "csharp"),
+    "C++": ("c/c++", "cpp"),
+    "C": ("c/c++",),
+    "Ruby": ("ruby", "rails"),
+    "PHP": ("php", "laravel"),
+    "Swift": ("swift", "ios"),
+    "Kotlin": ("kotlin", "android"),
+    "Scala": ("scala",),
+    "Elixir": ("elixir", "phoenix"),
+    "Clojure": ("clojure",),
+    "Haskell": ("haskell",),
+    "R": ("r",),
+    "Julia": ("julia",),
+    "Dart": ("dart", "flutter"),
+    "Perl": ("perl",),
+    "Objective-C": ("objective-c", "ios"),
+    "Shell": ("shell", "bash"),
+    "Vue": ("vue",),
+    "HTML": ("html", "web"),
+    "CSS": ("css", "web"),
+    "SCSS": ("scss", "sass"),
+    "Lua": ("lua",),
+    "Groovy": ("groovy",),
+    "PowerShell": ("powershell",)
+}
+
+
+# Keyword in a lowercased requirements.txt/setup.py -> framework it marks
+PYTHON_FRAMEWORK_KEYWORDS = {
+    "django": "django",
+    "flask": "flask",
+    "fastapi": "fastapi",
+    "tensorflow": "ml/ai",
+    "torch": "ml/ai"
+}
+# One scan over the manifest for all keywords; the lookahead reports overlapping hits like `in` would
+PYTHON_FRAMEWORK_PATTERN = re.compile(f"(?=({'|'.join(map(re.escape, PYTHON_FRAMEWORK_KEYWORDS))}))")
+
+
+def _index_indicators(
+    indicators: Dict[str, Tuple[str, ...]]
+) -> Tuple[Dict[str, List[str]], Dict[str, List[str]], List[Tuple[Pattern, str]]]:
+    """
+    Invert the indicator table so one pass over a repository's files finds every tech.
+
+    Returns:
+        (file name -> techs, "*.ext" suffix -> techs, (compiled glob, tech) for any other pattern)
+    """
+    exact_index, suffix_index, globs = {}, {}, []
+    for tech, patterns in indicators.items():
+        for pattern in patterns:
+            if not any(c in pattern for c in "*?["):
+                exact_index.setdefault(pattern, []).append(tech)
+            elif pattern.startswith("*.") and not any(c in pattern[2:] for c in "*?[."):
+                suffix_index.setdefault(pattern[2:], []).append(tech)
+            else:
+                globs.append((re.compile(fnmatch.translate(pattern)), tech))
+    return exact_index, suffix_index, globs
+
+
+_EXACT_INDEX, _SUFFIX_INDEX, _GLOB_INDICATORS = _index_indicators(TECH_INDICATORS)
+
+
+@asynccontextmanager
+async def _client(http_client: Optional[httpx.AsyncClient] = None):
+    """Yield the caller's shared HTTP client if one was provided, else a short-lived one."""
+    if http_client:
+        yield http_client
+    else:
+        async with httpx.AsyncClient() as client:
+            yield client
+
+
+def _is_unreachable(repo_key: Tuple[str, str, str]) -> bool:
+    """Whether the repository recently returned 404 for this token."""
+    expiry = _unreachable_repos.get(repo_key)
+    return expiry is not None and time.monotonic() < expiry
+
+
+def _mark_unreachable(owner: str, repo_name: str, token_key: str):
+    """Remember that the repository returned 404 for this token."""
+    repo_key = (owner, repo_name, token_key)
+    _unreachable_repos[repo_key] = time.monotonic() + UNREACHABLE_TTL_SECONDS
+    _unreachable_repos.move_to_end(repo_key)
+    if len(_unreachable_repos) > TECH_STACK_CACHE_SIZE:
+        _unreachable_repos.popitem(last=False)
+
+
+def _token_key(headers: Dict[str, str]) -> str:
+    """Hash of the request's credentials, for keying per-caller state without holding the token."""
+    token = headers.get("Authorization", "")
+    return hashlib.sha256(token.encode("utf-8")).hexdigest() if token else ""
+
+
+def _retry_after_seconds(retry_after: str) -> float:
+    """Seconds to wait from a Retry-After header, which is either a delay or an HTTP-date."""
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
+
+
+def _record_rate_limit(response: httpx.Response, token_key: str):
+    """Remember when a nearly spent rate limit resets, from GitHub's rate limit headers."""
+    resource = response.headers.get("X-RateLimit-Resource", "core")
+    retry_after = response.headers.get("Retry-After")
+    if response.status_code in (403, 429) and retry_after:
+        # Secondary rate limits only say how long to back off
+        backoff = _retry_after_seconds(retry_after)
+        _rate_limit_resets[(token_key, resource)] = time.time() + backoff
+        logger.warning(f"GitHub secondary rate limit hit, backing off for {int(backoff)}s")
+        return
+    
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    reset = response.headers.get("X-RateLimit-Reset")
+    if remaining is None or reset is None:
+        return
+    if int(remaining) < RATE_LIMIT_FLOOR:
+        _rate_limit_resets[(token_key, resource)] = float(reset)
+        logger.warning(f"GitHub {resource} rate limit nearly spent ({remaining} left), skipping calls until {reset}")
+    else:
+        _rate_limit_resets.pop((token_key, resource), None)
+
+
+def _rate_limited(token_key: str, resource: str = "core") -> bool:
+    """Whether calls against the given rate limit should be skipped for now."""
+    reset = _rate_limit_resets.get((token_key, resource))
+    return reset is not None and time.time() < reset
+
+
+async def _cached_get(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: Dict[str, str],
+    media_type: Optional[str] = None
+) -> Tuple[int, Any]:
+    """
+    GET a GitHub REST URL, revalidating any cached copy with its ETag.
+    304s don't count against the rate limit and carry no body.
+
+    Args:
+        client: HTTP client to send the request with
+        url: REST API URL
+        headers: Request headers, including any Authorization
+        media_type: Media type to ask for instead of JSON, such as RAW_MEDIA_TYPE for a file's text
+
+    Returns:
+        (status code, parsed JSON body or the text of a media_type response); the body is None for non-200 responses
+    """
+    token_key = _token_key(headers)
+    if _rate_limited(token_key):
+        return 429, None
+    
+    # Key on the token too, so one caller's private data is never served to another
+    cache_key = (url, token_key)
+    cached = _etag_cache.get(cache_key)
+    
+    request_headers = dict(headers)
+    if media_type:
+        request_headers["Accept"] = media_type
+    if cached:
+        request_headers["If-None-Match"] = cached[0]
+    response = await client.get(url, headers=request_headers, timeout=30.0)
+    _record_rate_limit(response, token_key)
+    if response.status_code == 304 and cached:
+        if cache_key in _etag_cache:
+            _etag_cache.move_to_end(cache_key)
+        return 200, cached[1]
+    if response.status_code != 200:
+        return response.status_code, None
+    
+    body = response.text if media_type else response.json()
+    etag = response.headers.get("ETag")
+    if etag:
+        _etag_cache[cache_key] = (etag, body)
+        _etag_cache.move_to_end(cache_key)
+        if len(_etag_cache) > ETAG_CACHE_SIZE:
+            _etag_cache.popitem(last=False)
+    return 200, body
+
+
+async def _fetch_repo_data_graphql(
+    client: httpx.AsyncClient,
+    owner: str,
+    repo_name: str,
+    headers: Dict[str, str]
+) -> Optional[Dict[str, Any]]:
+    """
+    Fetch languages, the root listing, the framework manifests and the workflow
+    listing in a single GraphQL request (GraphQL requires a token).
+
+    Returns:
+        Repository data in the shape returned by _fetch_repo_data_rest,
+        or None if the request failed and the REST API should be used instead
+    """
+    token_key = _token_key(headers)
+    if _rate_limited(token_key, "graphql"):
+        return None
+    
+    try:
+        response = await client.post(
+            GITHUB_GRAPHQL_URL,
+            json={"query": REPO_DATA_QUERY, "variables": {"owner": owner, "name": repo_name}},
+            headers=headers,
+            timeout=30.0
+        )
+        _record_rate_limit(response, token_key)
+        logger.debug("GraphQL API response status: %s", response.status_code)
+        if response.status_code != 200:
+            return None
+        
+        repository = (response.json().get("data") or {}).get("repository")
+        if not repository or not repository.get("root"):
+            logger.warning(f"GraphQL returned no repository data for {owner}/{repo_name}, falling back to REST")
+            return None
+    except Exception as e:
+        logger.warning(f"GraphQL request failed for {owner}/{repo_name}: {e}")
+        return None
+    
+    entries = repository["root"].get("entries") or []
+    workflows = repository.get("workflows") or {}
+    target = (repository.get("defaultBranchRef") or {}).get("target") or {}
+    return {
+        "head_sha": target.get("oid"),
+        "languages": [node["name"] for node in repository["languages"]["nodes"]],
+        "files": frozenset(entry["name"] for entry in entries if entry["type"] == "blob"),
+        "dirs": [entry["name"] for entry in entries if entry["type"] == "tree"],
+        "manifests": {
+            path: repository[alias]["text"]
+            for alias, path in GRAPHQL_MANIFESTS.items()
+            if repository.get(alias) and repository[alias].get("text") is not None
+        },
+        "workflows": [entry["name"] for entry in workflows.get("entries") or []]
+    }
+
+
+async def _fetch_repo_data_rest(
+    client: httpx.AsyncClient,
+    owner: str,
+    repo_name: str,
+    headers: Dict[str, str]
+) -> Dict[str, Any]:
+    """
+    Fetch the same repository data as _fetch_repo_data_graphql through the REST API.
+    The HEAD SHA, languages and the root listing are requested together, then all
+    manifests and the workflow listing together, so latency is two round trips.
+
+    Returns:
+        Dict with head_sha, languages, files (a frozenset of root file names), dirs,
+        manifests (path -> text) and workflows.
+        files and dirs are None if the root listing could not be fetched.
+    """
+    repo_data = {"head_sha": None, "languages": [], "files": None, "dirs": None, "manifests": {}, "workflows": []}
+    api_url = f"https://api.github.com/repos/{owner}/{repo_name}/contents"
+    # The root tree lists just path and type per entry, unlike the contents API's links and URLs
+    tree_url = f"https://api.github.com/repos/{owner}/{repo_name}/git/trees/HEAD"
+    languages_url = f"https://api.github.com/repos/{owner}/{repo_name}/languages"
+    head_url = f"https://api.github.com/repos/{owner}/{repo_name}/commits/HEAD"
+    logger.debug("API URLs: tree=%s, languages=%s", tree_url, languages_url)
+    
+    # Fetch the HEAD SHA, languages and the root directory listing
+    logger.debug("Fetching root directory contents...")
+    head_result, languages_result, tree_result = await asyncio.gather(
+        _cached_get(client, head_url, headers, media_type=SHA_MEDIA_TYPE),
+        _cached_get(client, languages_url, headers),
+        _cached_get(client, tree_url, headers),
+        return_exceptions=True
+    )
+    if not isinstance(head_result, Exception) and head_result[0] == 200:
+        repo_data["head_sha"] = head_result[1].strip()
+    
+    if isinstance(languages_result, Exception):
+        logger.error(f"Error fetching languages: {languages_result}")
+    else:
+        languages_status, languages = languages_result
+        logger.debug("Languages API response status: %s", languages_status)
+        if languages_status == 200:
+            repo_data["languages"] = list(languages.keys())
+            logger.debug("Detected languages: %s", repo_data['languages'])
+        else:
+            logger.error(f"Failed to fetch languages: {languages_status}")
+            if languages_status == 404:
+                logger.error("Repository not found or no access (check if it's private and token is provided)")
+    
+    if isinstance(tree_result, Exception):
+        raise tree_result
+    contents_status, contents = tree_result
+    logger.debug("Tree API response status: %s", contents_status)
+    if contents_status != 200:
+        logger.error(f"Failed to fetch root tree: {contents_status}")
+        if contents_status == 404:
+            # Missing, or private without a valid token - skip the repository for a while
+            _mark_unreachable(owner, repo_name, _token_key(headers))
+            logger.error("Repository contents not found or no access (check if it's private and token is provided)")
+        return repo_data
+    
+    files = frozenset(item['path'] for item in contents['tree'] if item['type'] == 'blob')
+    dirs = [item['path'] for item in contents['tree'] if item['type'] == 'tree']
+    repo_data["files"], repo_data["dirs"] = files, dirs
+    
+    manifest_paths = [path for path in ("package.json", "Gemfile", "composer.json") if path in files]
+    if "requirements.txt" in files or "setup.py" in files:
+        manifest_paths.append("requirements.txt" if "requirements.txt" in files else "setup.py")
+    
+    fetches = [_cached_get(client, f"{api_url}/{path}", headers, media_type=RAW_MEDIA_TYPE) for path in manifest_paths]
+    if '.github' in dirs:
+        fetches.append(_cached_get(client, f"{api_url}/.github/workflows", headers))
+    results = await asyncio.gather(*fetches, return_exceptions=True)
+    
+    for path, result in zip(manifest_paths, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error fetching {path}: {result}")
+            continue
+        manifest_status, manifest = result
+        if manifest_status == 200:
+            repo_data["manifests"][path] = manifest
+    
+    if '.github' in dirs:
+        workflows_result = results[-1]
+        if not isinstance(workflows_result, Exception):
+            workflows_status, workflows = workflows_result
+            if workflows_status == 200:
+                repo_data["workflows"] = [item['name'] for item in workflows]
+    
+    return repo_data
+
+
+async def detect_tech_stack(
+    repo_url: str,
+    github_token: Optional[str] = None,
+    http_client: Optional[httpx.AsyncClient] = None
+) -> List[str]:
     """
     Detect the tech stack of a GitHub repository by examining common project files.
+    Pass a shared http_client to reuse its pooled connections.
     """
     logger.info(f"Starting tech stack detection for repo: {repo_url}")
-    tech_stack = []
+    tech_stack: Set[str] = set()
     
     try:
         parts = repo_url.rstrip('/').split('/')
         if len(parts) < 2:
             logger.warning(f"Invalid repo URL format: {repo_url}")
-            return tech_stack
+            return list(tech_stack)
         owner, repo_name = parts[-2], parts[-1].rstrip('.git')
-        logger.info(f"Extracted owner: {owner}, repo: {repo_name}")
-        
-        api_url = f"https://api.github.com/repos/{owner}/{repo_name}/contents"
-        languages_url = f"https://api.github.com/repos/{owner}/{repo_name}/languages"
-        logger.info(f"API URLs: contents={api_url}, languages={languages_url}")
+        logger.debug("Extracted owner: %s, repo: %s", owner, repo_name)
         
         headers = {}
         if github_token:
             headers['Authorization'] = f'token {github_token}'
-            logger.info("Using authenticated GitHub API requests")
+            logger.debug("Using authenticated GitHub API requests")
         else:
             logger.warning("No GitHub token provided - private repositories will fail")
         
-        indicators = {
-            "python": ["requirements.txt", "setup.py", "Pipfile", "pyproject.toml", "poetry.lock", "environment.yml", "conda.yml"],
-            "nodejs": ["package.json", "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "bun.lockb"],
-            "java": ["pom.xml", "build.gradle", "build.gradle.kts", "build.xml", "settings.gradle"],
-            "go": ["go.mod", "go.sum", "Gopkg.toml", "Gopkg.lock"],
-            "rust": ["Cargo.toml", "Cargo.lock"],
-            "dotnet": ["*.csproj", "*.fsproj", "*.vbproj", "*.sln", "nuget.config"],
-            "ruby": ["Gemfile", "Gemfile.lock", "*.gemspec"],
-            "php": ["composer.json", "composer.lock"],
-            "docker": ["Dockerfile", "docker-compose.yml", "docker-compose.yaml", ".dockerignore"],
-            "kubernetes": ["*.yaml", "*.yml", "kustomization.yaml"],
-            "terraform": ["*.tf", "*.tfvars", "terraform.tfstate"],
-            "typescript": ["tsconfig.json", "*.ts", "*.tsx"],
-            "react": ["package.json"],
-            "vue": ["vue.config.js", "nuxt.config.js", "nuxt.config.ts"],
-            "angular": ["angular.json", "ng-package.json"],
-            "flutter": ["pubspec.yaml", "pubspec.lock"],
-            "swift": ["Package.swift", "*.xcodeproj", "*.xcworkspace", "Podfile"],
-            "kotlin": ["build.gradle.kts", "settings.gradle.kts"],
-            "scala": ["build.sbt", "*.scala"],
-            "elixir": ["mix.exs", "mix.lock"],
-            "clojure": ["project.clj", "deps.edn", "build.boot"],
-            "haskell": ["*.cabal", "stack.yaml", "cabal.project"],
-            "r": ["DESCRIPTION", "*.Rproj", "renv.lock"],
-            "julia": ["Project.toml", "Manifest.toml"],
-            "dart": ["pubspec.yaml", "pubspec.lock"],
-            "perl": ["Makefile.PL", "Build.PL", "cpanfile"],
-            "c/c++": ["CMakeLists.txt", "Makefile", "*.vcxproj", "meson.build"],
-            "mongodb": ["*.mongodb", "mongod.conf"],
-            "postgres": ["*.sql", "postgresql.conf"],
-            "redis": ["redis.conf", "*.rdb"],
-            "nginx": ["nginx.conf", "*.nginx"],
-            "apache": ["httpd.conf", ".htaccess"],
-            "cmake": ["CMakeLists.txt", "*.cmake"],
-            "make": ["Makefile", "GNUmakefile"],
-            "ansible": ["ansible.cfg", "playbook.yml", "inventory.ini"],
-            "jenkins": ["Jenkinsfile", "jenkins.yaml"],
-            "gitlab-ci": [".gitlab-ci.yml"],
-            "github-actions": [".github/workflows/*.yml", ".github/workflows/*.yaml"],
-            "circleci": [".circleci/config.yml"],
-            "travis-ci": [".travis.yml"],
-            "webpack": ["webpack.config.js", "webpack.config.ts"],
-            "vite": ["vite.config.js", "vite.config.ts"],
-            "rollup": ["rollup.config.js", "rollup.config.mjs"],
-            "babel": [".babelrc", "babel.config.js", "babel.config.json"],
-            "eslint": [".eslintrc", ".eslintrc.js", ".eslintrc.json", "eslint.config.js"],
-            "prettier": [".prettierrc", "prettier.config.js"],
-            "jest": ["jest.config.js", "jest.config.ts"],
-            "pytest": ["pytest.ini", "pyproject.toml"],
-            "maven": ["pom.xml"],
-            "gradle": ["build.gradle", "build.gradle.kts", "settings.gradle"],
-            "npm": ["package.json"],
-            "pip": ["requirements.txt", "setup.py"],
-            "conda": ["environment.yml", "conda.yml"],
-            "poetry": ["pyproject.toml", "poetry.lock"]
-        }
+        recent_key = (owner, repo_name, _token_key(headers))
+        recent = _recent_tech_stacks.get(recent_key)
+        if recent and time.monotonic() - recent[0] < TECH_STACK_TTL_SECONDS:
+            logger.info(f"Using tech stack detected for {repo_url} {int(time.monotonic() - recent[0])}s ago")
+            return list(recent[1])
         
-        # Language to framework mapping
-        language_frameworks = {
-            "Python": ["python", "django", "flask", "fastapi"],
-            "JavaScript": ["nodejs", "javascript"],
-            "TypeScript": ["typescript", "nodejs"],
-            "Java": ["java", "spring"],
-            "Go": ["go"],
-            "Rust": ["rust"],
-            "C#": ["dotnet", "csharp"],
-            "C++": ["c/c++", "cpp"],
-            "C": ["c/c++"],
-            "Ruby": ["ruby", "rails"],
-            "PHP": ["php", "laravel"],
-            "Swift": ["swift", "ios"],
-            "Kotlin": ["kotlin", "android"],
-            "Scala": ["scala"],
-            "Elixir": ["elixir", "phoenix"],
-            "Clojure": ["clojure"],
-            "Haskell": ["haskell"],
-            "R": ["r"],
-            "Julia": ["julia"],
-            "Dart": ["dart", "flutter"],
-            "Perl": ["perl"],
-            "Objective-C": ["objective-c", "ios"],
-            "Shell": ["shell", "bash"],
-            "Vue": ["vue"],
-            "HTML": ["html", "web"],
-            "CSS": ["css", "web"],
-            "SCSS": ["scss", "sass"],
-            "Lua": ["lua"],
-            "Groovy": ["groovy"],
-            "PowerShell": ["powershell"]
-        }
+        if _is_unreachable(recent_key):
+            logger.warning(f"Skipping tech stack detection for {repo_url}: repository recently returned 404")
+            return list(tech_stack)
         
-        try:
-            languages_response = requests.get(languages_url, headers=headers)
-            logger.info(f"Languages API response status: {languages_response.status_code}")
-            if languages_response.status_code == 200:
-                languages = languages_response.json()
-                logger.info(f"Detected languages: {list(languages.keys())}")
-                for language, _ in languages.items():
-                    if language in language_frameworks:
-                        tech_stack.extend(language_frameworks[language])
-                        logger.info(f"Added frameworks for {language}: {language_frameworks[language]}")
-            else:
-                logger.error(f"Failed to fetch languages: {languages_response.status_code}")
-                if languages_response.status_code == 404:
+        async with _client(http_client) as client:
+            # Only a previous detection needs the HEAD SHA up front; the ETag'd request also
+            # confirms this caller can read the repository, and a 304 is free against the rate limit
+            cached = _tech_stack_cache.get(repo_url)
+            if cached:
+                try:
+                    head_status, head_sha = await _cached_get(
+                        client,
+                        f"https://api.github.com/repos/{owner}/{repo_name}/commits/HEAD",
+                        headers,
+                        media_type=SHA_MEDIA_TYPE
+                    )
+                except Exception as e:
+                    logger.warning(f"Error resolving HEAD for {owner}/{repo_name}: {e}")
+                    head_status, head_sha = None, None
+                if head_status == 404:
+                    _mark_unreachable(owner, repo_name, recent_key[2])
                     logger.error("Repository not found or no access (check if it's private and token is provided)")
-        except Exception as e:
-            logger.error(f"Error fetching languages: {e}")
+                    return list(tech_stack)
+                if head_status == 200 and head_sha.strip() == cached[0]:
+                    _tech_stack_cache.move_to_end(repo_url)
+                    logger.info(f"Using cached tech stack for {repo_url} at {cached[0]}")
+                    return list(cached[1])
+            
+            repo_data = await _fetch_repo_data_graphql(client, owner, repo_name, headers) if github_token else None
+            if repo_data is None:
+                repo_data = await _fetch_repo_data_rest(client, owner, repo_name, headers)
         
-        # Fetch root directory contents
-        logger.info("Fetching root directory contents...")
-        response = requests.get(api_url, headers=headers)
-        logger.info(f"Contents API response status: {response.status_code}")
-        if response.status_code != 200:
-            logger.error(f"Failed to fetch contents: {response.status_code}")
-            if response.status_code == 404:
-                logger.error("Repository contents not found or no access (check if it's private and token is provided)")
-            return tech_stack
+        for language in repo_data["languages"]:
+            frameworks = LANGUAGE_FRAMEWORKS.get(language)
+            if frameworks:
+                tech_stack.update(frameworks)
+                logger.debug("Added frameworks for %s: %s", language, frameworks)
+        
+        if repo_data["files"] is None:
+            return list(tech_stack)
         
-        contents = response.json()
-        files = [item['name'] for item in contents if item['type'] == 'file']
-        dirs = [item['name'] for item in contents if item['type'] == 'dir']
-        logger.info(f"Found {len(files)} files and {len(dirs)} directories")
-        logger.info(f"Files: {files[:10]}...")  # Log first 10 files
+        files = repo_data["files"]
+        dirs = repo_data["dirs"]
+        manifests = repo_data["manifests"]
+        logger.debug("Found %d files and %d directories", len(files), len(dirs))
+        # Sorting the names is the only costly part, so skip it unless debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Files: %s...", sorted(files)[:10])  # Log first 10 files
         
         # Check for framework-specific patterns in package.json
         framework_detected = set()
-        if "package.json" in files:
-            logger.info("Checking package.json for frameworks...")
+        if "package.json" in manifests:
+            logger.debug("Checking package.json for frameworks...")
             try:
-                pkg_url = f"https://api.github.com/repos/{owner}/{repo_name}/contents/package.json"
-                pkg_response = requests.get(pkg_url, headers=headers)
-                if pkg_response.status_code == 200:
-                    import json
-                    import base64
-                    pkg_content = json.loads(base64.b64decode(pkg_response.json()['content']))
-                    deps = {**pkg_content.get('dependencies', {}), **pkg_content.get('devDependencies', {})}
-                    
-                    if 'react' in deps or 'react-dom' in deps:
-                        framework_detected.add('react')
-                        logger.info("Detected React framework")
-                    if 'vue' in deps or '@vue/cli' in deps:
-                        framework_detected.add('vue')
-                        logger.info("Detected Vue framework")
-                    if '@angular/core' in deps:
-                        framework_detected.add('angular')
-                        logger.info("Detected Angular framework")
-                    if 'next' in deps:
-                        framework_detected.add('nextjs')
-                        logger.info("Detected Next.js framework")
-                    if 'nuxt' in deps:
-                        framework_detected.add('nuxt')
-                        logger.info("Detected Nuxt framework")
-                    if 'svelte' in deps:
-                        framework_detected.add('svelte')
-                        logger.info("Detected Svelte framework")
-                    if 'express' in deps:
-                        framework_detected.add('express')
-                        logger.info("Detected Express framework")
-                    if 'nestjs' in deps or '@nestjs/core' in deps:
-                        framework_detected.add('nestjs')
-                        logger.info("Detected NestJS framework")
+                pkg_content = orjson.loads(manifests["package.json"])
+                # Only dependency names matter, so take a set of keys rather than merging the dicts
+                deps = pkg_content.get('dependencies', {}).keys() | pkg_content.get('devDependencies', {}).keys()
+                
+                if 'react' in deps or 'react-dom' in deps:
+                    framework_detected.add('react')
+                    logger.debug("Detected React framework")
+                if 'vue' in deps or '@vue/cli' in deps:
+                    framework_detected.add('vue')
+                    logger.debug("Detected Vue framework")
+                if '@angular/core' in deps:
+                    framework_detected.add('angular')
+                    logger.debug("Detected Angular framework")
+                if 'next' in deps:
+                    framework_detected.add('nextjs')
+                    logger.debug("Detected Next.js framework")
+                if 'nuxt' in deps:
+                    framework_detected.add('nuxt')
+                    logger.debug("Detected Nuxt framework")
+                if 'svelte' in deps:
+                    framework_detected.add('svelte')
+                    logger.debug("Detected Svelte framework")
+                if 'express' in deps:
+                    framework_detected.add('express')
+                    logger.debug("Detected Express framework")
+                if 'nestjs' in deps or '@nestjs/core' in deps:
+                    framework_detected.add('nestjs')
+                    logger.debug("Detected NestJS framework")
             except Exception as e:
                 logger.error(f"Error checking package.json: {e}")
         
         # Check for Python framework indicators in requirements.txt or setup.py
-        if "requirements.txt" in files or "setup.py" in files:
-            logger.info("Checking Python files for frameworks...")
-            try:
-                file_to_check = "requirements.txt" if "requirements.txt" in files else "setup.py"
-                req_url = f"https://api.github.com/repos/{owner}/{repo_name}/contents/{file_to_check}"
-                req_response = requests.get(req_url, headers=headers)
-                if req_response.status_code == 200:
-                    import base64
-                    req_content = base64.b64decode(req_response.json()['content']).decode('utf-8').lower()
-                    
-                    if 'django' in req_content:
-                        framework_detected.add('django')
-                        logger.info("Detected Django framework")
-                    if 'flask' in req_content:
-                        framework_detected.add('flask')
-                        logger.info("Detected Flask framework")
-                    if 'fastapi' in req_content:
-                        framework_detected.add('fastapi')
-                        logger.info("Detected FastAPI framework")
-                    if 'tensorflow' in req_content or 'torch' in req_content:
-                        framework_detected.add('ml/ai')
-                        logger.info("Detected ML/AI framework")
-            except Exception as e:
-                logger.error(f"Error checking Python files: {e}")
+        python_manifest = "requirements.txt" if "requirements.txt" in files else "setup.py"
+        if python_manifest in manifests:
+            logger.debug("Checking Python files for frameworks...")
+            req_content = manifests[python_manifest].lower()
+            
+            for tag in {PYTHON_FRAMEWORK_KEYWORDS[keyword] for keyword in PYTHON_FRAMEWORK_PATTERN.findall(req_content)}:
+                framework_detected.add(tag)
+                logger.debug("Detected %s framework", tag)
         
         # Check for Ruby on Rails
-        if "Gemfile" in files:
-            try:
-                gemfile_url = f"https://api.github.com/repos/{owner}/{repo_name}/contents/Gemfile"
-                gemfile_response = requests.get(gemfile_url, headers=headers)
-                if gemfile_response.status_code == 200:
-                    import base64
-                    gemfile_content = base64.b64decode(gemfile_response.json()['content']).decode('utf-8').lower()
-                    
-                    if 'rails' in gemfile_content:
-                        framework_detected.add('rails')
-            except:
-                pass
+        if "Gemfile" in manifests:
+            if 'rails' in manifests["Gemfile"].lower():
+                framework_detected.add('rails')
         
         # Check for PHP frameworks
-        if "composer.json" in files:
+        if "composer.json" in manifests:
             try:
-                composer_url = f"https://api.github.com/repos/{owner}/{repo_name}/contents/composer.json"
-                composer_response = requests.get(composer_url, headers=headers)
-                if composer_response.status_code == 200:
-                    import json
-                    import base64
-                    composer_content = json.loads(base64.b64decode(composer_response.json()['content']))
-                    deps = {**composer_content.get('require', {}), **composer_content.get('require-dev', {})}
-                    
-                    if any('laravel' in dep.lower() for dep in deps.keys()):
-                        framework_detected.add('laravel')
-                    if any('symfony' in dep.lower() for dep in deps.keys()):
-                        framework_detected.add('symfony')
+                composer_content = orjson.loads(manifests["composer.json"])
+                deps = composer_content.get('require', {}).keys() | composer_content.get('require-dev', {}).keys()
+                
+                if any('laravel' in dep.lower() for dep in deps):
+                    framework_detected.add('laravel')
+                if any('symfony' in dep.lower() for dep in deps):
+                    framework_detected.add('symfony')
             except:
                 pass
         
         # Check directories for CI/CD workflows
-        if '.github' in dirs:
-            try:
-                workflows_url = f"https://api.github.com/repos/{owner}/{repo_name}/contents/.github/workflows"
-                workflows_response = requests.get(workflows_url, headers=headers)
-                if workflows_response.status_code == 200:
-                    workflow_files = workflows_response.json()
-                    if any(item['name'].endswith(('.yml', '.yaml')) for item in workflow_files):
-                        framework_detected.add('github-actions')
-            except:
-                pass
+        if any(name.endswith(('.yml', '.yaml')) for name in repo_data["workflows"]):
+            framework_detected.add('github-actions')
         
-        for tech, files_list in indicators.items():
-            for file in files_list:
-                if file in files or any(fnmatch.fnmatch(f, file) for f in files):
-                    tech_stack.append(tech)
-                    logger.info(f"Detected tech: {tech} from file: {file}")
-                    break
+        for f in files:
+            tech_stack.update(_EXACT_INDEX.get(f, ()))
+            _, dot, suffix = f.rpartition('.')
+            if dot:
+                tech_stack.update(_SUFFIX_INDEX.get(suffix, ()))
+            tech_stack.update(tech for regex, tech in _GLOB_INDICATORS if regex.match(f))
         
         # Add detected frameworks
-        tech_stack.extend(list(framework_detected))
+        tech_stack.update(framework_detected)
         
-        final_tech_stack = list(set(tech_stack))  # Remove duplicates
+        final_tech_stack = list(tech_stack)
         logger.info(f"Final tech stack: {final_tech_stack}")
+        
+        # Manifest fetches may have been skipped for the rate limit, so don't keep a partial result
+        if _rate_limited(recent_key[2]):
+            return final_tech_stack
+        
+        if repo_data["head_sha"]:
+            _tech_stack_cache[repo_url] = (repo_data["head_sha"], list(final_tech_stack))
+            _tech_stack_cache.move_to_end(repo_url)
+            if len(_tech_stack_cache) > TECH_STACK_CACHE_SIZE:
+                _tech_stack_cache.popitem(last=False)
+        _recent_tech_stacks[recent_key] = (time.monotonic(), list(final_tech_stack))
+        _recent_tech_stacks.move_to_end(recent_key)
+        if len(_recent_tech_stacks) > TECH_STACK_CACHE_SIZE:
+            _recent_tech_stacks.popitem(last=False)
         return final_tech_stack
     
     except Exception as e:
         print(f"Error detecting tech stack: {e}")
-        return tech_stack
\ No newline at end of file
+        return list(tech_stack)
\ No newline at end of file